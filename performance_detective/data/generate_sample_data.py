@@ -1,38 +1,25 @@
 # Python script to generate the CSV file
-# Save this as generate_sample_data.py and run it
+# Run from the project root: python data/generate_sample_data.py [options]
+#
+# Thin wrapper around src/datagen.py, which generates data chunk-wise with
+# vectorized random draws across worker processes. Defaults reproduce the
+# original 1,000-row sample_data.csv shape; see --help for larger fixtures,
+# distributions and the columnar output format.
 
-import csv
-import random
+import os
+import sys
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-def generate_sample_data(filename="sample_data.csv", rows=1000):
-    """Generate sample CSV data for the exercise"""
-
-    # Ensure data directory exists
-    import os
-
-    os.makedirs("data", exist_ok=True)
-
-    with open(filename, "w", newline="") as csvfile:
-        writer = csv.writer(csvfile)
+from src.datagen import generate, main  # noqa: E402
 
-        # Write header
-        writer.writerow(["id", "value", "category", "score"])
-
-        # Generate data with some duplicates and patterns
-        categories = ["A", "B", "C", "D", "E"]
-
-        for i in range(rows):
-            row_id = i + 1
-            # Create some duplicate values
-            value = random.randint(1, rows // 2)
-            category = random.choice(categories)
-            score = random.randint(0, 100)
-
-            writer.writerow([row_id, value, category, score])
 
+def generate_sample_data(filename="sample_data.csv", rows=1000, **options):
+    """Generate sample CSV data for the exercise"""
+    stats = generate(filename, rows, **options)
     print(f"Generated {filename} with {rows} rows")
+    return stats
 
 
 if __name__ == "__main__":
-    generate_sample_data()
+    main(sys.argv[1:] or [os.path.join("data", "sample_data.csv")])
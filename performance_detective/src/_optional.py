@@ -0,0 +1,24 @@
+"""Lazy access to optional dependencies."""
+
+import importlib
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def optional_import(name):
+    """
+    Import an optional dependency on first use.
+
+    Heavy packages such as NumPy and pandas are only imported by the
+    code paths that need them, so importing src stays cheap.
+
+    Args:
+        name: Module name, e.g. "numpy"
+
+    Returns:
+        The module, or None when it is not installed
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
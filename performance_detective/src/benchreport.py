@@ -0,0 +1,462 @@
+"""
+Benchmark history store and HTML performance report.
+
+pytest-benchmark saves each run (--benchmark-autosave, or
+--benchmark-json FILE) as a JSON file under .benchmarks/. This module
+ingests those files into a single history, keyed by commit and
+machine, and renders a static HTML report from it:
+- regressions of the latest run against earlier runs on the same
+  machine, listed first and highlighted
+- latest results with peak memory where a benchmark recorded it
+- latency-vs-size curves per function
+- trend lines over the history
+- side-by-side comparisons of backend variants
+
+Charts need matplotlib, which is imported only when a report is
+rendered; without it the report has the tables only.
+
+Typical use:
+
+    pytest src --benchmark-autosave
+    python -m src.benchreport --output benchmark_report.html
+"""
+
+import argparse
+import base64
+import html
+import io
+import json
+import os
+import re
+import tracemalloc
+from statistics import median
+
+from ._optional import optional_import
+
+DEFAULT_STORAGE = ".benchmarks"
+HISTORY_FILE = "history.jsonl"
+
+# Latest runs more than this much slower than the baseline are regressions
+DEFAULT_THRESHOLD = 0.10
+# Number of earlier runs whose median mean forms the baseline
+DEFAULT_BASELINE_RUNS = 3
+
+# Dataset sizes behind the _small/_medium/_large fixtures in test_performance
+SIZE_LABELS = {"small": 100, "medium": 1_000, "large": 10_000}
+
+_STATS = ("mean", "median", "min", "max", "stddev", "rounds")
+
+
+def measure_peak_memory(func, *args, **kwargs):
+    """
+    Peak memory allocated by one call, in bytes.
+
+    Benchmarks store the result as extra_info["peak_memory"] so the
+    report can show it next to the timings. The call runs under
+    tracemalloc, which is slow, so keep it out of the timed rounds.
+    """
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    start, _ = tracemalloc.get_traced_memory()
+    try:
+        func(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        if not already_tracing:
+            tracemalloc.stop()
+    return peak - start
+
+
+def machine_key(machine_info):
+    """Short machine identity: host, CPU and Python version."""
+    cpu = machine_info.get("cpu", {}).get("brand_raw") or machine_info.get("processor", "")
+    return "/".join(
+        part for part in (
+            machine_info.get("node", ""),
+            cpu,
+            f"{machine_info.get('python_implementation', '')} {machine_info.get('python_version', '')}".strip(),
+        ) if part
+    )
+
+
+def commit_key(commit_info):
+    """Short commit identity, marked when the tree had local changes."""
+    commit = (commit_info.get("id") or "unknown")[:10]
+    return commit + "+dirty" if commit_info.get("dirty") else commit
+
+
+def load_run(path):
+    """
+    Read one pytest-benchmark JSON file into a history entry.
+
+    Returns:
+        Dict with 'commit', 'machine', 'datetime', 'branch' and
+        'benchmarks' (name -> timing stats, group, params, extra_info)
+    """
+    with open(path) as runfile:
+        raw = json.load(runfile)
+    commit_info = raw.get("commit_info", {})
+    benchmarks = {}
+    for bench in raw["benchmarks"]:
+        stats = bench["stats"]
+        entry = {key: stats[key] for key in _STATS if key in stats}
+        entry.update(
+            group=bench.get("group"),
+            params=bench.get("params"),
+            extra_info=bench.get("extra_info") or {},
+        )
+        benchmarks[bench["name"]] = entry
+    return {
+        "commit": commit_key(commit_info),
+        "machine": machine_key(raw.get("machine_info", {})),
+        "datetime": raw.get("datetime", ""),
+        "branch": commit_info.get("branch"),
+        "benchmarks": benchmarks,
+    }
+
+
+def _run_files(paths):
+    """pytest-benchmark JSON files among files and directories."""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in sorted(os.walk(path)):
+                for name in sorted(names):
+                    if name.endswith(".json"):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def read_history(history_path):
+    """Load the history, oldest run first."""
+    if not os.path.exists(history_path):
+        return []
+    with open(history_path) as history_file:
+        return [json.loads(line) for line in history_file if line.strip()]
+
+
+def ingest(paths, history_path):
+    """
+    Add benchmark runs to the history file.
+
+    The history holds one run per (commit, machine); a newer run of
+    the same commit on the same machine replaces the older one, so
+    re-running the suite refreshes a commit instead of skewing its
+    trend.
+
+    Args:
+        paths: pytest-benchmark JSON files, or directories to search
+        history_path: JSON-lines history file (created if missing)
+
+    Returns:
+        The updated history, oldest run first
+    """
+    runs = {(run["commit"], run["machine"]): run for run in read_history(history_path)}
+    for path in _run_files(paths):
+        try:
+            run = load_run(path)
+        except (ValueError, KeyError):
+            continue  # Not a pytest-benchmark file
+        key = (run["commit"], run["machine"])
+        if key not in runs or runs[key]["datetime"] <= run["datetime"]:
+            runs[key] = run
+
+    history = sorted(runs.values(), key=lambda run: run["datetime"])
+    os.makedirs(os.path.dirname(os.path.abspath(history_path)), exist_ok=True)
+    with open(history_path + ".tmp", "w") as history_file:
+        for run in history:
+            history_file.write(json.dumps(run, separators=(",", ":")) + "\n")
+    os.replace(history_path + ".tmp", history_path)
+    return history
+
+
+def find_regressions(history, threshold=DEFAULT_THRESHOLD, baseline_runs=DEFAULT_BASELINE_RUNS):
+    """
+    Compare each machine's latest run against its earlier runs.
+
+    The baseline of a benchmark is the median of its mean over the
+    previous `baseline_runs` runs on the same machine. A benchmark
+    regressed when its mean is more than `threshold` above the baseline
+    and even its fastest round is slower than the baseline, which keeps
+    noisy benchmarks from being flagged.
+
+    Returns:
+        List of dicts with 'machine', 'commit', 'name', 'mean',
+        'baseline', 'change' (relative) and 'status' ("regression",
+        "improvement" or "unchanged"), one per benchmark of each latest run
+    """
+    comparisons = []
+    for machine, runs in _by_machine(history).items():
+        latest, earlier = runs[-1], runs[:-1][-baseline_runs:]
+        for name, stats in sorted(latest["benchmarks"].items()):
+            means = [run["benchmarks"][name]["mean"] for run in earlier if name in run["benchmarks"]]
+            if not means:
+                continue
+            baseline = median(means)
+            change = stats["mean"] / baseline - 1
+            if change > threshold and stats.get("min", stats["mean"]) > baseline:
+                status = "regression"
+            elif change < -threshold and stats.get("max", stats["mean"]) < baseline:
+                status = "improvement"
+            else:
+                status = "unchanged"
+            comparisons.append({
+                "machine": machine,
+                "commit": latest["commit"],
+                "name": name,
+                "mean": stats["mean"],
+                "baseline": baseline,
+                "change": change,
+                "status": status,
+            })
+    return comparisons
+
+
+def _by_machine(history):
+    """Runs grouped by machine, each group oldest first."""
+    machines = {}
+    for run in history:
+        machines.setdefault(run["machine"], []).append(run)
+    return machines
+
+
+def split_name(name, extra_info=None):
+    """
+    Split a benchmark name into (function, size).
+
+    The size comes from extra_info["size"] when the benchmark recorded
+    one, otherwise from a _small/_medium/_large suffix; it is None for
+    benchmarks without a size.
+    """
+    base = re.sub(r"\[.*\]$", "", name)
+    base = base[len("test_"):] if base.startswith("test_") else base
+    size = (extra_info or {}).get("size")
+    function, _, label = base.rpartition("_")
+    if label in SIZE_LABELS:
+        return function, size or SIZE_LABELS[label]
+    return base, size
+
+
+def _variant_groups(benchmarks):
+    """
+    Benchmarks that are variants of one another, for backend comparisons.
+
+    Variants share a pytest-benchmark group, or are parametrizations of
+    the same test (test_x[python], test_x[numpy]).
+    """
+    groups = {}
+    for name, stats in benchmarks.items():
+        if stats.get("group"):
+            groups.setdefault(stats["group"], []).append(name)
+        elif stats.get("params"):
+            groups.setdefault(re.sub(r"\[.*\]$", "", name), []).append(name)
+    return {key: sorted(names) for key, names in sorted(groups.items()) if len(names) > 1}
+
+
+def _format_seconds(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3g} {unit}"
+    return f"{seconds / 1e-9:.3g} ns"
+
+
+def _format_bytes(size):
+    if size is None:
+        return ""
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.4g} {unit}"
+        size /= 1024
+    return f"{size:.4g} GiB"
+
+
+def _png(figure):
+    """A matplotlib figure as an inline <img> tag."""
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format="png", dpi=80, bbox_inches="tight")
+    encoded = base64.b64encode(buffer.getvalue()).decode()
+    return f'<img src="data:image/png;base64,{encoded}">'
+
+
+def _scaling_charts(figure_module, latest):
+    """Latency (and peak memory, when recorded) against size, per function."""
+    curves = {}
+    for name, stats in latest["benchmarks"].items():
+        function, size = split_name(name, stats["extra_info"])
+        if size is not None and not stats.get("params"):
+            curves.setdefault(function, []).append((size, stats["mean"], stats["extra_info"].get("peak_memory")))
+    charts = []
+    for function, points in sorted(curves.items()):
+        if len(points) < 2:
+            continue
+        points.sort()
+        sizes = [point[0] for point in points]
+        memory = [point[2] for point in points]
+        has_memory = any(peak is not None for peak in memory)
+        figure = figure_module.Figure(figsize=(8 if has_memory else 4, 3))
+        axes = figure.add_subplot(1, 2 if has_memory else 1, 1)
+        axes.loglog(sizes, [point[1] for point in points], marker="o")
+        axes.set(title=function, xlabel="size", ylabel="mean seconds")
+        if has_memory:
+            memory_axes = figure.add_subplot(1, 2, 2)
+            memory_axes.loglog(
+                [s for s, peak in zip(sizes, memory) if peak is not None],
+                [peak for peak in memory if peak is not None],
+                marker="o", color="tab:orange",
+            )
+            memory_axes.set(title=f"{function} peak memory", xlabel="size", ylabel="bytes")
+        charts.append(_png(figure))
+    return charts
+
+
+def _trend_charts(figure_module, runs):
+    """Mean over the history of one machine, one chart per function."""
+    functions = {}
+    for name in runs[-1]["benchmarks"]:
+        function, _ = split_name(name, runs[-1]["benchmarks"][name]["extra_info"])
+        functions.setdefault(function, []).append(name)
+    commits = [run["commit"] for run in runs]
+    charts = []
+    for function, names in sorted(functions.items()):
+        figure = figure_module.Figure(figsize=(6, 3))
+        axes = figure.add_subplot()
+        for name in sorted(names):
+            points = [
+                (index, run["benchmarks"][name]["mean"])
+                for index, run in enumerate(runs) if name in run["benchmarks"]
+            ]
+            axes.plot([p[0] for p in points], [p[1] for p in points], marker="o", label=name)
+        axes.set_yscale("log")
+        axes.set_xticks(range(len(commits)), commits, rotation=45, ha="right", fontsize=7)
+        axes.set(title=function, ylabel="mean seconds")
+        axes.legend(fontsize=7)
+        charts.append(_png(figure))
+    return charts
+
+
+def _comparison_charts(figure_module, latest):
+    """Horizontal bars of the mean of each variant."""
+    charts = []
+    for group, names in _variant_groups(latest["benchmarks"]).items():
+        figure = figure_module.Figure(figsize=(6, 0.5 + 0.4 * len(names)))
+        axes = figure.add_subplot()
+        axes.barh(names, [latest["benchmarks"][name]["mean"] for name in names])
+        axes.set(title=group, xlabel="mean seconds")
+        charts.append(_png(figure))
+    return charts
+
+
+_STYLE = """
+body { font-family: sans-serif; margin: 2em; }
+table { border-collapse: collapse; margin-bottom: 1.5em; }
+th, td { border: 1px solid #ccc; padding: 0.25em 0.6em; text-align: right; }
+th:first-child, td:first-child { text-align: left; }
+tr.regression { background: #f8d0d0; font-weight: bold; }
+tr.improvement { background: #d4f0d4; }
+img { margin: 0.5em; }
+"""
+
+
+def _table(headers, rows, classes=None):
+    """An HTML table; classes gives an optional CSS class per row."""
+    parts = ["<table><tr>", *(f"<th>{html.escape(h)}</th>" for h in headers), "</tr>"]
+    for index, row in enumerate(rows):
+        css = f' class="{classes[index]}"' if classes and classes[index] else ""
+        parts.append(f"<tr{css}>" + "".join(f"<td>{html.escape(str(cell))}</td>" for cell in row) + "</tr>")
+    parts.append("</table>")
+    return "".join(parts)
+
+
+def render_report(history, threshold=DEFAULT_THRESHOLD, baseline_runs=DEFAULT_BASELINE_RUNS):
+    """
+    Render the history as a self-contained HTML page.
+
+    Returns:
+        The HTML text
+    """
+    comparisons = find_regressions(history, threshold, baseline_runs)
+    status = {(c["machine"], c["name"]): c for c in comparisons}
+    regressions = [c for c in comparisons if c["status"] == "regression"]
+    figure_module = optional_import("matplotlib.figure")
+
+    body = [f"<h1>Benchmark report</h1><p>{len(history)} runs on "
+            f"{len(_by_machine(history))} machine(s); regression threshold {threshold:.0%}.</p>"]
+    if figure_module is None:
+        body.append("<p>matplotlib is not installed: charts are omitted.</p>")
+
+    body.append(f"<h2>Regressions ({len(regressions)})</h2>")
+    if regressions:
+        body.append(_table(
+            ["benchmark", "machine", "commit", "mean", "baseline", "change"],
+            [[c["name"], c["machine"], c["commit"], _format_seconds(c["mean"]),
+              _format_seconds(c["baseline"]), f"{c['change']:+.1%}"] for c in regressions],
+            ["regression"] * len(regressions),
+        ))
+    else:
+        body.append("<p>None.</p>")
+
+    for machine, runs in _by_machine(history).items():
+        latest = runs[-1]
+        body.append(f"<h2>{html.escape(machine)}</h2><p>Latest run: commit "
+                    f"{html.escape(latest['commit'])} at {html.escape(latest['datetime'])}</p>")
+        rows, classes = [], []
+        for name, stats in sorted(latest["benchmarks"].items()):
+            comparison = status.get((machine, name))
+            rows.append([
+                name,
+                _format_seconds(stats["mean"]),
+                _format_seconds(stats.get("stddev", 0)),
+                stats.get("rounds", ""),
+                f"{comparison['change']:+.1%}" if comparison else "",
+                _format_bytes(stats["extra_info"].get("peak_memory")),
+            ])
+            classes.append(comparison["status"] if comparison else None)
+        body.append(_table(["benchmark", "mean", "stddev", "rounds", "vs baseline", "peak memory"], rows, classes))
+
+        if figure_module is not None:
+            for title, charts in (
+                ("Latency vs size", _scaling_charts(figure_module, latest)),
+                ("Trends", _trend_charts(figure_module, runs) if len(runs) > 1 else []),
+                ("Backend comparisons", _comparison_charts(figure_module, latest)),
+            ):
+                if charts:
+                    body.append(f"<h3>{title}</h3>" + "".join(charts))
+
+    return (
+        "<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>Benchmark report</title>"
+        f"<style>{_STYLE}</style></head><body>{''.join(body)}</body></html>\n"
+    )
+
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Ingest pytest-benchmark runs and write an HTML report")
+    parser.add_argument("inputs", nargs="*", default=[DEFAULT_STORAGE],
+                        help=f"benchmark JSON files or directories (default: {DEFAULT_STORAGE})")
+    parser.add_argument("--history", default=os.path.join(DEFAULT_STORAGE, HISTORY_FILE),
+                        help="history file (default: %(default)s)")
+    parser.add_argument("--output", default="benchmark_report.html")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="relative slowdown counted as a regression (default: %(default)s)")
+    parser.add_argument("--baseline-runs", type=int, default=DEFAULT_BASELINE_RUNS)
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="exit with status 1 when the latest run regressed")
+    args = parser.parse_args(argv)
+
+    history = ingest(args.inputs, args.history)
+    with open(args.output, "w") as report:
+        report.write(render_report(history, args.threshold, args.baseline_runs))
+    regressions = [
+        c for c in find_regressions(history, args.threshold, args.baseline_runs) if c["status"] == "regression"
+    ]
+    print(f"Wrote {args.output}: {len(history)} runs, {len(regressions)} regression(s)")
+    for c in regressions:
+        print(f"  {c['name']} on {c['machine']}: {c['change']:+.1%}")
+    if regressions and args.fail_on_regression:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""
+Compressed integer bitmaps for duplicate detection.
+
+A Python set spends 16 to 32 bytes per value on its hash table, on
+top of the int objects the caller's list already holds. IntBitmap
+stores integers roaring-style instead: values are
+split into a high key (value >> 16) and a 16-bit low part, and each
+high key owns a container for its low parts:
+- array container: sorted array('H'), 2 bytes per value, used while
+  the chunk holds at most 4096 values
+- bitset container: 8 KiB bytearray with one bit per possible value,
+  used once the chunk is dense enough that this is smaller
+
+Single values can be added and tested in pure Python; batch operations
+take sorted unique int64 NumPy arrays and work a container at a time.
+
+Every container also costs a Python object and a dict entry, about
+150 bytes, so bitmaps only pay off for dense values: spread thinly,
+each value gets a container of its own and costs more than in a set.
+is_dense tells which inputs are worth it.
+
+End to end, find_int_duplicates also holds one batch of temporaries
+and builds the result's int objects, so its peak memory is that plus
+the bitmaps (measured with benchreport.measure_peak_memory: 15 MB vs
+50 MB for the two sets on 1M shuffled IDs, 16 MB vs 201 MB on 4M).
+"""
+
+import sys
+from array import array
+from bisect import bisect_left
+
+from ._optional import optional_import
+
+# Containers switch from array to bitset above this many values
+ARRAY_MAX = 4096
+BITSET_BYTES = 1 << 13
+
+# Values processed per batch by find_int_duplicates. Each batch costs
+# about 50 bytes per value in temporaries (measured: 4M distinct IDs
+# peak at 16 MB with 1 << 18, 61 MB with 1 << 20, at nearly the same
+# speed)
+DEFAULT_BATCH_SIZE = 1 << 18
+
+# Values per 65,536-value chunk of their range from which bitmaps beat
+# two sets on both time and memory (measured with 500k random IDs: at
+# 256 per chunk about 1.3x faster and under 3 bytes per value)
+MIN_DENSITY = 256
+
+# Values of a list whose range is_dense checks
+DENSITY_PROBE = 1024
+
+
+class IntBitmap:
+    """Set of integers stored as roaring-style compressed containers."""
+
+    def __init__(self):
+        self.containers = {}
+
+    def __len__(self):
+        total = 0
+        for container in self.containers.values():
+            if isinstance(container, bytearray):
+                total += int.from_bytes(container, "little").bit_count()
+            else:
+                total += len(container)
+        return total
+
+    def __contains__(self, value):
+        container = self.containers.get(value >> 16)
+        if container is None:
+            return False
+        low = value & 0xFFFF
+        if isinstance(container, bytearray):
+            return bool(container[low >> 3] >> (low & 7) & 1)
+        index = bisect_left(container, low)
+        return index < len(container) and container[index] == low
+
+    def __iter__(self):
+        for high in sorted(self.containers):
+            container = self.containers[high]
+            base = high << 16
+            if isinstance(container, bytearray):
+                for byte_index, byte in enumerate(container):
+                    while byte:
+                        bit = byte & -byte
+                        yield base | (byte_index << 3) | (bit.bit_length() - 1)
+                        byte ^= bit
+            else:
+                for low in container:
+                    yield base | low
+
+    @property
+    def nbytes(self):
+        """Bytes used: the containers with their object headers, their keys and the dict holding them."""
+        return sys.getsizeof(self.containers) + sum(
+            sys.getsizeof(high) + sys.getsizeof(container) for high, container in self.containers.items()
+        )
+
+    def add(self, value):
+        """Add one integer."""
+        high, low = value >> 16, value & 0xFFFF
+        container = self.containers.get(high)
+        if container is None:
+            self.containers[high] = array("H", [low])
+        elif isinstance(container, bytearray):
+            container[low >> 3] |= 1 << (low & 7)
+        else:
+            index = bisect_left(container, low)
+            if index == len(container) or container[index] != low:
+                container.insert(index, low)
+                if len(container) > ARRAY_MAX:
+                    self.containers[high] = _to_bitset(container)
+
+    def _chunks(self, np, values):
+        """Split sorted int64 values into (high, uint16 lows) per container."""
+        highs = values >> 16
+        bounds = np.flatnonzero(highs[1:] != highs[:-1]) + 1
+        starts = [0, *bounds.tolist()]
+        ends = [*bounds.tolist(), len(values)]
+        lows = (values & 0xFFFF).astype(np.uint16)
+        for start, end in zip(starts, ends):
+            yield int(highs[start]), lows[start:end]
+
+    def contains_many(self, values):
+        """
+        Membership of many values at once.
+
+        Args:
+            values: Sorted, unique int64 NumPy array
+
+        Returns:
+            Boolean NumPy array, one entry per value
+        """
+        np = optional_import("numpy")
+        found = np.zeros(len(values), dtype=bool)
+        if not len(values):
+            return found
+        offset = 0
+        for high, lows in self._chunks(np, values):
+            container = self.containers.get(high)
+            if container is not None:
+                if isinstance(container, bytearray):
+                    bits = np.frombuffer(container, dtype=np.uint8)
+                    hits = (bits[lows >> 3] >> (lows & 7).astype(np.uint8)) & 1
+                    found[offset:offset + len(lows)] = hits.astype(bool)
+                else:
+                    found[offset:offset + len(lows)] = np.isin(
+                        lows, np.frombuffer(container, dtype=np.uint16), assume_unique=True
+                    )
+            offset += len(lows)
+        return found
+
+    def add_many(self, values):
+        """
+        Add many values at once.
+
+        Args:
+            values: Sorted, unique int64 NumPy array
+        """
+        np = optional_import("numpy")
+        if not len(values):
+            return
+        for high, lows in self._chunks(np, values):
+            container = self.containers.get(high)
+            if isinstance(container, bytearray):
+                bits = np.frombuffer(container, dtype=np.uint8)
+                masks = np.left_shift(1, (lows & 7).astype(np.uint8)).astype(np.uint8)
+                np.bitwise_or.at(bits, lows >> 3, masks)
+                continue
+            if container is not None:
+                lows = np.union1d(np.frombuffer(container, dtype=np.uint16), lows)
+            if len(lows) > ARRAY_MAX:
+                bits = np.zeros(BITSET_BYTES * 8, dtype=bool)
+                bits[lows] = True
+                self.containers[high] = bytearray(np.packbits(bits, bitorder="little").tobytes())
+            else:
+                packed = array("H")
+                packed.frombytes(lows.astype(np.uint16).tobytes())
+                self.containers[high] = packed
+
+    def to_list(self):
+        """All values in ascending order."""
+        np = optional_import("numpy")
+        if np is None:
+            return list(self)
+        values = []
+        for high in sorted(self.containers):
+            container = self.containers[high]
+            if isinstance(container, bytearray):
+                bits = np.unpackbits(np.frombuffer(container, dtype=np.uint8), bitorder="little")
+                lows = np.flatnonzero(bits)
+            else:
+                lows = np.frombuffer(container, dtype=np.uint16).astype(np.int64)
+            # A container at a time, so no int64 copy of the whole set
+            values.extend((lows + (high << 16)).tolist())
+        return values
+
+
+def _to_bitset(container):
+    """Convert an array container to a bitset container."""
+    bits = bytearray(BITSET_BYTES)
+    for low in container:
+        bits[low >> 3] |= 1 << (low & 7)
+    return bits
+
+
+def _chunks_spanned(lowest, highest):
+    """Number of 65,536-value chunks from lowest to highest."""
+    return ((int(highest) - int(lowest)) >> 16) + 1
+
+
+def is_dense(values):
+    """
+    Whether values are dense enough for bitmaps to beat sets.
+
+    Checks the average number of values per 65,536-value chunk over
+    the range from the smallest to the largest value. Arrays are
+    checked over their full range. For lists, the range of a strided
+    probe of about DENSITY_PROBE values stands in for it, which costs
+    O(1) instead of two passes over int objects scattered in memory;
+    values outside the probe's range only add containers of their own.
+    No sort and no conversion is needed, so it is cheap enough to run
+    before deciding to build arrays.
+
+    Args:
+        values: List or NumPy array of integers; anything that has no
+            integer range (strings, NaN, empty input) is not dense
+    """
+    try:
+        if hasattr(values, "dtype"):
+            lowest, highest = values.min(), values.max()
+        else:
+            probe = values[::max(1, len(values) // DENSITY_PROBE)]
+            lowest, highest = min(probe), max(probe)
+        chunks = ((int(highest) - int(lowest)) >> 16) + 1
+    except (TypeError, ValueError, OverflowError):
+        return False
+    return len(values) >= MIN_DENSITY * chunks
+
+
+def _int64_batch(np, batch):
+    """
+    A batch as an int64 array.
+
+    Raises:
+        TypeError: A value is not an int (bools and floats included)
+        OverflowError: A value does not fit in int64
+    """
+    if hasattr(batch, "dtype"):
+        if batch.dtype.kind != "i":
+            raise TypeError(f"not an integer array: {batch.dtype}")
+        return batch.astype(np.int64, copy=False)
+    if set(map(type, batch)) != {int}:
+        raise TypeError("not all values are ints")
+    return np.fromiter(batch, dtype=np.int64, count=len(batch))
+
+
+def find_int_duplicates(values, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Find duplicate integers using two IntBitmaps instead of two sets.
+
+    Values are processed in batches: each batch is converted to int64,
+    reduced to its unique values with counts, values repeated inside
+    the batch or already in `seen` are added to `duplicates`, and the
+    batch's unique values are added to `seen`. Lists are converted a
+    batch at a time, so besides the result the bitmaps are the only
+    state that grows with the input. Requires NumPy.
+
+    Args:
+        values: List of ints or integer NumPy array
+        batch_size: Values per batch
+
+    Returns:
+        Sorted list of duplicate integers
+
+    Raises:
+        TypeError: A value is not an int
+        OverflowError: A value does not fit in int64
+    """
+    np = optional_import("numpy")
+    seen = IntBitmap()
+    duplicates = IntBitmap()
+    for start in range(0, len(values), batch_size):
+        batch = _int64_batch(np, values[start:start + batch_size])
+        unique, counts = np.unique(batch, return_counts=True)
+        repeated = (counts > 1) | seen.contains_many(unique)
+        duplicates.add_many(unique[repeated])
+        seen.add_many(unique)
+    return duplicates.to_list()
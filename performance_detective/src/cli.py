@@ -0,0 +1,148 @@
+"""
+Command-line interface: python -m src OPERATION... [options]
+
+Runs process_large_dataset operations over a CSV file, a columnar
+directory (see datagen) or stdin, reading the input in chunks and
+printing the results as JSON:
+
+    python -m src statistics duplicates data/sample_data.csv
+    python -m src statistics --column score data/sample_data.csv
+    seq 1 1000 | python -m src statistics filter -
+
+Startup matters for short invocations in shell pipelines, so nothing
+heavier than the standard library is imported unless the chosen
+input needs it: the default python backend parses CSV with the csv
+module, and NumPy/pandas are only loaded for --backend numpy or
+columnar input.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from .data_processor import DEFAULT_CHUNK_SIZE, filter_and_transform
+from .distributed import PartialState
+from .records import csv_chunks, line_chunks, parse_number
+
+OPERATIONS = ["duplicates", "statistics", "filter"]
+
+
+def _pandas_chunks(path, column, chunk_size):
+    """Numeric chunks from a CSV column via pandas' C parser (numpy backend)."""
+    import pandas as pd
+
+    for frame in pd.read_csv(path, usecols=[column], chunksize=chunk_size):
+        yield frame[column].tolist()
+
+
+def _columnar_chunks(path, column, chunk_size):
+    """Numeric chunks from a memory-mapped .npy column."""
+    import numpy as np
+
+    values = np.load(os.path.join(path, column + ".npy"), mmap_mode="r")
+    for start in range(0, len(values), chunk_size):
+        yield values[start:start + chunk_size].tolist()
+
+
+def _stdin_chunks(stream, column, chunk_size):
+    """Chunks from stdin: CSV when the first line is a header, else one value per line."""
+    first = stream.readline()
+    lines = _prepended(first, stream)
+    try:
+        parse_number(first)
+    except ValueError:
+        return csv_chunks(lines, column, chunk_size)
+    return line_chunks(lines, chunk_size)
+
+
+def _prepended(first, stream):
+    """The stream's lines with an already-read first line put back."""
+    yield first
+    yield from stream
+
+
+def _chunk_source(source, args):
+    """
+    A callable returning a fresh chunk iterator over the input.
+
+    Returns None for stdin, which can only be read once.
+    """
+    if source == "-":
+        return None
+    if os.path.isdir(source):
+        return lambda: _columnar_chunks(source, args.column, args.chunk_size)
+    if args.backend == "numpy":
+        return lambda: _pandas_chunks(source, args.column, args.chunk_size)
+
+    def read():
+        with open(source, newline="") as csvfile:
+            yield from csv_chunks(csvfile, args.column, args.chunk_size)
+
+    return read
+
+
+def run(source, operations, args, stdin=None):
+    """
+    Run operations over an input in chunks.
+
+    A first pass folds every chunk into a PartialState (count, sum and
+    frequency table). The filter needs the mean before it can start, so
+    it takes a second pass; stdin cannot be re-read, so its values are
+    kept in memory when filter is requested.
+
+    Returns:
+        Dictionary with results of each operation
+    """
+    chunks = _chunk_source(source, args)
+    kept = None
+    if chunks is None:
+        first_pass = _stdin_chunks(stdin or sys.stdin, args.column, args.chunk_size)
+        if "filter" in operations:
+            kept = []
+    else:
+        first_pass = chunks()
+
+    state = PartialState()
+    for chunk in first_pass:
+        state.update(chunk)
+        if kept is not None:
+            kept.append(chunk)
+
+    results = state.results(operations)
+    if "duplicates" in results:
+        results["duplicates"].sort()
+    if "filter" in operations:
+        results["filtered"] = []
+        if state.count:
+            threshold = state.total / state.count  # Use mean as threshold
+            for chunk in kept if kept is not None else chunks():
+                results["filtered"].extend(filter_and_transform(chunk, threshold))
+    results["rows"] = state.count
+    return results
+
+
+def main(argv=None, stdin=None, stdout=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(
+        prog="python -m src",
+        description="Run data_processor operations over a file or stdin and print JSON.",
+    )
+    parser.add_argument("operations", nargs="+", choices=OPERATIONS, metavar="OPERATION",
+                        help=f"one or more of: {', '.join(OPERATIONS)}")
+    parser.add_argument("input", help="CSV file, columnar directory, or - for stdin")
+    parser.add_argument("--column", default="value", help="numeric column to process (default: value)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="values per chunk")
+    parser.add_argument("--backend", choices=["python", "numpy"], default="python",
+                        help="CSV parser: csv module (fast startup) or pandas (fast bulk)")
+    # Intermixed, so options may come between operations and the input
+    args = parser.parse_intermixed_args(argv)
+
+    try:
+        results = run(args.input, args.operations, args, stdin=stdin)
+    except ValueError as error:  # Missing column or a non-numeric field
+        parser.error(str(error))
+    out = stdout or sys.stdout
+    json.dump(results, out)
+    out.write("\n")
@@ -4,125 +4,686 @@ These functions are designed to demonstrate performance bottlenecks
 that can be identified and optimized using Claude Code.
 """
 
+import math
+import time
 from collections import Counter
+from functools import partial
+from itertools import chain, compress, islice
+from operator import eq, le, lt, ne, not_
 
+from ._optional import optional_import
+from .bitmap import find_int_duplicates, is_dense
+from .metrics import REGISTRY, SIZE_BUCKETS
 
-def find_duplicates(items):
+# Elements handled between progress reports and deadline checks
+DEFAULT_CHUNK_SIZE = 65_536
+
+# Inputs at least this long use the NumPy path when NumPy is installed
+VECTORIZE_MIN_SIZE = 10_000
+
+# Integer inputs at least this long use compressed bitmaps; below it the
+# two sets stay cache-resident and are just as fast
+BITMAP_MIN_SIZE = 100_000
+
+# Metrics (see metrics.py). Labelled children are bound once here, so
+# an update on the hot path is a flag check and a locked increment.
+_FIND_DUPLICATES_CALLS = REGISTRY.counter(
+    "find_duplicates_calls_total", "find_duplicates calls by algorithm", ["algorithm"]
+)
+_DUPLICATES_SORTED = _FIND_DUPLICATES_CALLS.labels(algorithm="sorted")
+_DUPLICATES_BITMAP = _FIND_DUPLICATES_CALLS.labels(algorithm="bitmap")
+_DUPLICATES_HASH = _FIND_DUPLICATES_CALLS.labels(algorithm="hash")
+_DUPLICATES_PARALLEL = _FIND_DUPLICATES_CALLS.labels(algorithm="parallel")
+_NEAR_DUPLICATES_CALLS = REGISTRY.counter(
+    "find_near_duplicates_calls_total", "find_near_duplicates calls by algorithm", ["algorithm"]
+)
+_NEAR_DUPLICATES_NUMPY = _NEAR_DUPLICATES_CALLS.labels(algorithm="numpy")
+_NEAR_DUPLICATES_PYTHON = _NEAR_DUPLICATES_CALLS.labels(algorithm="python")
+_STATISTICS_CALLS = REGISTRY.counter(
+    "calculate_statistics_calls_total", "calculate_statistics calls by method", ["method"]
+)
+_STATISTICS_EXACT = _STATISTICS_CALLS.labels(method="exact")
+_STATISTICS_APPROXIMATE = _STATISTICS_CALLS.labels(method="approximate")
+_INPUT_ELEMENTS = REGISTRY.histogram(
+    "process_large_dataset_input_elements", "Input size of process_large_dataset calls",
+    buckets=SIZE_BUCKETS,
+).labels()
+_OPERATION_SECONDS = REGISTRY.histogram(
+    "process_large_dataset_operation_seconds", "Time per process_large_dataset pass", ["operation"]
+)
+_SORT_SECONDS = _OPERATION_SECONDS.labels(operation="sort")
+_DUPLICATES_SECONDS = _OPERATION_SECONDS.labels(operation="duplicates")
+_STATISTICS_SECONDS = _OPERATION_SECONDS.labels(operation="statistics")
+_FILTER_SECONDS = _OPERATION_SECONDS.labels(operation="filter")
+_FREQUENCIES_SECONDS = _OPERATION_SECONDS.labels(operation="frequencies")
+_CHUNKS = REGISTRY.counter(
+    "process_large_dataset_chunks_total", "Chunks streamed by process_large_dataset's frequency passes"
+).labels()
+_PARTIAL_RUNS = REGISTRY.counter(
+    "process_large_dataset_partial_total", "Runs cut short by their deadline"
+).labels()
+
+
+def _is_sorted(items):
+    """
+    Check whether items are in non-decreasing order.
+
+    O(n) single pass driven from C (map/all), stopping at the first
+    descent. Five evenly spaced items are compared first, so most
+    unsorted inputs are rejected without the scan. Items that cannot
+    be ordered are reported as unsorted.
+    """
+    try:
+        quarter = len(items) // 4
+        if quarter and not (
+            items[0] <= items[quarter] <= items[2 * quarter] <= items[3 * quarter] <= items[-1]
+        ):
+            return False
+        return all(map(le, items, islice(items, 1, None)))
+    except TypeError:
+        return False
+
+
+def _sorted_view(data, presorted=False):
+    """
+    Return data in sorted order, reusing it when presorted.
+
+    Timsort finds the existing runs, so sorted or nearly sorted input
+    costs close to one linear pass in sorted() itself.
+    """
+    return data if presorted else sorted(data)
+
+
+def _duplicates_of_sorted(sorted_items):
+    """
+    Duplicates of sorted items, each once, in order.
+
+    Equal items are adjacent in sorted data, so one C-driven pass
+    keeps every item equal to its predecessor - no hashing needed - and
+    a second pass over those repeats drops the adjacent copies.
+    """
+    following = islice(sorted_items, 1, None)
+    repeats = list(compress(following, map(eq, sorted_items, islice(sorted_items, 1, None))))
+    if len(repeats) < 2:
+        return repeats
+    return [repeats[0], *compress(islice(repeats, 1, None), map(ne, repeats, islice(repeats, 1, None)))]
+
+
+def _median_of_sorted(sorted_data):
+    """Median of sorted, non-empty data by index - O(1)."""
+    n = len(sorted_data)
+    if n % 2 == 1:
+        return sorted_data[n // 2]
+    return (sorted_data[n // 2 - 1] + sorted_data[n // 2]) / 2
+
+
+def _mode(data, sorted_data):
+    """
+    Mode of non-empty data; ties go to the smallest value.
+
+    Counter finds the highest count in the input's own order (counting
+    the sorted copy visits its int objects out of allocation order,
+    which is slower on large inputs). Equal values are adjacent in the
+    sorted copy, so the mode is the first value whose run reaches that
+    count, found by a C-driven scan that stops there.
+    """
+    top = max(Counter(data).values())
+    ends = islice(sorted_data, top - 1, None)
+    return next(compress(sorted_data, map(eq, sorted_data, ends)))
+
+
+def _int64_array(items):
+    """
+    Items as an int64 NumPy array if they are all integers, else None.
+
+    Also None when NumPy is missing or a value does not fit in int64.
+    bools are not treated as integers.
+    """
+    np = optional_import("numpy")
+    if np is None:
+        return None
+    if hasattr(items, "dtype"):
+        return items.astype(np.int64, copy=False) if items.dtype.kind == "i" else None
+    if set(map(type, items)) != {int}:
+        return None
+    try:
+        return np.array(items, dtype=np.int64)
+    except OverflowError:
+        return None
+
+
+def _starts_integer(items):
+    """
+    O(1) pre-check for the bitmap path: an integer array, or a list
+    whose first item is an int, with NumPy installed.
+
+    find_int_duplicates still checks every value as it converts them.
+    """
+    if optional_import("numpy") is None:
+        return False
+    if hasattr(items, "dtype"):
+        return items.dtype.kind == "i"
+    return type(items[0]) is int
+
+
+def find_duplicates(items, presorted=False, executor=None, workers=None):
     """
     Find all duplicate items in a list.
 
     Optimized implementation: O(n) using hash-based sets
     Uses two sets for O(1) membership testing and insertion
 
+    Sorted input is detected in O(n) and scanned for adjacent equal
+    items instead, which avoids hashing altogether. Large integer inputs
+    dense enough for it (see bitmap.is_dense) use compressed bitmaps
+    (see bitmap.find_int_duplicates) in place of the two sets when
+    NumPy is installed; sparse IDs and other types stay with the sets,
+    mostly rejected in O(1) (first item's type, a probe of the range).
+
+    With an executor, chunks are counted in parallel and the counts
+    merged (see parallel.py).
+
     Args:
-        items: List of items to check for duplicates
+        items: List or other iterable of items to check for duplicates
+        presorted: Skip the sortedness check and treat items as sorted
+        executor: "threads", "processes" or a concurrent.futures
+            executor to process chunks in parallel
+        workers: Number of parallel workers (default: CPU count)
 
     Returns:
         List of duplicate items (each duplicate appears once)
     """
-    seen = set()
-    duplicates = set()
+    if not hasattr(items, "__getitem__"):
+        # The checks below index and traverse items more than once
+        items = list(items)
+
+    if executor is not None:
+        from .parallel import parallel_find_duplicates
 
-    for item in items:
-        if item in seen:
-            # Already seen, so it's a duplicate
-            duplicates.add(item)
+        _DUPLICATES_PARALLEL.inc()
+        return parallel_find_duplicates(items, executor, workers)
+
+    if presorted or _is_sorted(items):
+        _DUPLICATES_SORTED.inc()
+        return _duplicates_of_sorted(items)
+
+    if len(items) >= BITMAP_MIN_SIZE and _starts_integer(items) and is_dense(items):
+        try:
+            duplicates = find_int_duplicates(items)
+        except (TypeError, OverflowError):
+            # A later value is not an int64; the sets take anything
+            pass
         else:
-            # First time seeing this item
-            seen.add(item)
+            _DUPLICATES_BITMAP.inc()
+            return duplicates
+
+    _DUPLICATES_HASH.inc()
+    seen = set()
+    mark_seen = seen.add
+
+    # An item already seen is a duplicate; otherwise mark_seen records
+    # it and returns None, which keeps it out of the duplicates
+    duplicates = {item for item in items if item in seen or mark_seen(item)}
 
     return list(duplicates)
 
 
-def calculate_statistics(data):
+def _near_clusters_python(values, abs_tol, rel_tol):
+    """Sort-and-sweep with math.isclose on neighbouring values."""
+    ordered = sorted(values)
+    isclose = partial(math.isclose, rel_tol=rel_tol, abs_tol=abs_tol)
+    close = map(isclose, ordered, islice(ordered, 1, None))
+    breaks = list(compress(range(1, len(ordered)), map(not_, close)))
+    bounds = zip(chain((0,), breaks), chain(breaks, (len(ordered),)))
+    return [ordered[start:end] for start, end in bounds if end - start > 1]
+
+
+def _near_clusters_numpy(np, values, abs_tol, rel_tol):
+    """
+    Sort-and-sweep with the neighbour test done on whole arrays.
+
+    Int and float lists are sorted as int64 or float64 arrays, so
+    members keep their types as in the pure-Python path. Other lists
+    (mixed types, ints beyond int64) are ordered by float64 copies and
+    their members taken from the original values.
+    """
+    array = values if hasattr(values, "dtype") else _int64_array(values)
+    if array is None and set(map(type, values)) == {float}:
+        array = np.array(values, dtype=np.float64)
+    if array is not None:
+        ordered = np.sort(array)
+        members = None
+    else:
+        numbers = np.asarray(values, dtype=np.float64)
+        order = np.argsort(numbers, kind="stable")
+        ordered = numbers[order]
+        members = np.array(values, dtype=object)[order].tolist()
+    numbers = ordered.astype(np.float64, copy=False)
+    left, right = numbers[:-1], numbers[1:]
+    tolerance = np.maximum(rel_tol * np.maximum(np.abs(left), np.abs(right)), abs_tol)
+    # Equal infinities are close, as with math.isclose
+    close = (right - left <= tolerance) | (left == right)
+    breaks = np.flatnonzero(~close) + 1
+    starts = np.concatenate(([0], breaks))
+    ends = np.append(breaks, len(ordered))
+    keep = ends - starts > 1
+    if members is None:
+        members = ordered.tolist()
+    return [members[start:end] for start, end in zip(starts[keep].tolist(), ends[keep].tolist())]
+
+
+def find_near_duplicates(values, abs_tol=0.0, rel_tol=1e-09):
+    """
+    Find clusters of values that are equal within a tolerance.
+
+    Optimized implementation: O(n log n) sort-and-sweep
+    - Sort once, then only neighbours need comparing: any value close
+      to x sits next to x (or next to another close value) in order
+    - A cluster ends where two neighbours are not close
+    Pairwise comparison would be O(n²), the pattern detailed_timing.py
+    measures for exact duplicates.
+
+    Closeness follows math.isclose. Clusters are chains of close
+    neighbours, so a long chain may span more than the tolerance from
+    end to end. Arrays and large lists use NumPy when it is installed.
+
+    Args:
+        values: List or array of numeric values
+        abs_tol: Absolute tolerance
+        rel_tol: Relative tolerance
+
+    Returns:
+        List of clusters with at least two members, each a dictionary
+        with the sorted 'members' and a 'representative' (the middle
+        member)
+    """
+    if abs_tol < 0 or rel_tol < 0:
+        raise ValueError("tolerances must be non-negative")
+
+    vectorize = len(values) >= VECTORIZE_MIN_SIZE or hasattr(values, "dtype")
+    np = optional_import("numpy") if vectorize else None
+    if np is not None:
+        _NEAR_DUPLICATES_NUMPY.inc()
+        clusters = _near_clusters_numpy(np, values, abs_tol, rel_tol)
+    else:
+        _NEAR_DUPLICATES_PYTHON.inc()
+        clusters = _near_clusters_python(values, abs_tol, rel_tol)
+
+    return [
+        {"representative": members[len(members) // 2], "members": members}
+        for members in clusters
+    ]
+
+
+def calculate_statistics(
+    data, presorted=False, approximate=False, sample_size=None, target_error=None, seed=None,
+    executor=None, workers=None,
+):
     """
     Calculate mean, median, and mode from a list of numbers.
 
-    Optimized implementation: O(n log n) overall
+    Optimized implementation: O(n log n) overall, O(n) for sorted input
     - Mean: O(n) single pass
-    - Median: O(n log n) sorting required
+    - Median: O(n log n) sorting, O(n) when data is already sorted
     - Mode: O(n) using Counter hash table
 
+    When several values share the highest count, the smallest one is
+    reported as the mode.
+
+    With approximate=True the statistics are estimated from a uniform
+    sample instead (see sampling.approximate_statistics), which also
+    accepts one-shot iterables and adds confidence intervals and a
+    duplicate-rate estimate to the result.
+
+    With an executor, chunks are reduced to frequency tables in
+    parallel and merged (see parallel.py); the results stay exact.
+
     Args:
         data: List of numeric values
+        presorted: Skip the sortedness check and treat data as sorted
+        approximate: Estimate from a sample instead of computing exactly
+        sample_size: Sample size for the approximate mode
+        target_error: Median quantile error for the approximate mode,
+            used to pick the sample size when sample_size is not given
+        seed: Random seed for the approximate mode
+        executor: "threads", "processes" or a concurrent.futures
+            executor to process chunks in parallel
+        workers: Number of parallel workers (default: CPU count)
 
     Returns:
         Dictionary with 'mean', 'median', and 'mode' keys
     """
-    if not data:
+    if approximate:
+        from .sampling import approximate_statistics
+
+        _STATISTICS_APPROXIMATE.inc()
+        return approximate_statistics(
+            data, sample_size=sample_size, target_error=target_error, seed=seed
+        )
+
+    _STATISTICS_EXACT.inc()
+    if executor is not None:
+        from .parallel import parallel_calculate_statistics
+
+        return parallel_calculate_statistics(data, executor, workers)
+
+    if not len(data):
         return {"mean": None, "median": None, "mode": None}
 
     # Calculate mean - O(n)
     mean = sum(data) / len(data)
 
-    # Calculate median - O(n log n) for sorting
-    sorted_data = sorted(data)
-    n = len(sorted_data)
-    if n % 2 == 1:
-        median = sorted_data[n // 2]
-    else:
-        median = (sorted_data[n // 2 - 1] + sorted_data[n // 2]) / 2
+    # Sort, or reuse presorted input, for the median
+    sorted_data = _sorted_view(data, presorted)
+
+    # Calculate median - O(1) by index
+    median = _median_of_sorted(sorted_data)
 
     # Calculate mode - O(n) using Counter
-    # Counter builds a hash table in single pass: O(n)
-    # most_common(1) finds the maximum: O(n)
-    counts = Counter(data)
-    mode = counts.most_common(1)[0][0]
+    mode = _mode(data, sorted_data)
 
     return {"mean": mean, "median": median, "mode": mode}
 
 
-def filter_and_transform(data, threshold):
+def transform_batches(data, threshold, transform=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Filter data above threshold and transform it a chunk at a time.
+
+    The batch stage behind filter_and_transform. Each chunk is filtered
+    in bulk (compress over a C-level comparison for lists, a boolean
+    mask for NumPy arrays) and the surviving values are handed to the
+    transform as one batch, so a vectorized transform never touches
+    values one by one. See formatting.py for the transforms provided.
+
+    Args:
+        data: List, NumPy array or other iterable of numeric values
+            (iterables without a length are read chunk by chunk)
+        threshold: Values must be greater than this to be kept
+        transform: Callable taking a chunk of kept values (list, or
+            array for array input); default formatting.upper_text
+        chunk_size: Values per chunk
+
+    Yields:
+        transform's result for each chunk, in order
+    """
+    from .formatting import upper_text
+
+    transform = transform or upper_text
+    above = partial(lt, threshold)  # above(item) is threshold < item
+    if hasattr(data, "__len__") and hasattr(data, "__getitem__"):
+        chunks = (data[start:start + chunk_size] for start in range(0, len(data), chunk_size))
+    else:
+        iterator = iter(data)
+        chunks = iter(lambda: list(islice(iterator, chunk_size)), [])
+    for chunk in chunks:
+        if hasattr(chunk, "dtype"):
+            yield transform(chunk[chunk > threshold])
+        else:
+            yield transform(list(compress(chunk, map(above, chunk))))
+
+
+def filter_and_transform(data, threshold, executor=None, workers=None, transform=None):
     """
     Filter data above threshold and apply transformation.
 
-    Current implementation: O(n·m) where m is string length
-    Issues:
-    - String concatenation in loop creates new string each time
-    - Inefficient str() conversion and character iteration
+    Optimized implementation: O(n) batch pipeline (see transform_batches)
+    - Filtering runs in C over whole chunks
+    - The default transform formats a whole chunk with map(str) and
+      str.upper instead of concatenating characters one at a time
+    About 2x faster than the original loop on a list of ints and 6x
+    on an int array; building one str per value bounds it (see
+    formatting.py for the over-10x bytes output).
+
+    A vectorized transform can be plugged in. For output as one block
+    of text, use transform_batches with formatting.format_lines.
+
+    With an executor, chunks are filtered in parallel and concatenated
+    in order (see parallel.py).
 
     Args:
-        data: List of numeric values
+        data: List or other iterable of numeric values
         threshold: Minimum value to include
+        executor: "threads", "processes" or a concurrent.futures
+            executor to process chunks in parallel
+        workers: Number of parallel workers (default: CPU count)
+        transform: Callable mapping a chunk of kept values to a list of
+            transformed values (default: str(value).upper() of each)
 
     Returns:
         List of transformed string values
     """
+    if executor is not None:
+        from .parallel import parallel_filter_and_transform
+
+        if not hasattr(data, "__getitem__"):
+            data = list(data)  # Chunks are sliced out by index
+        return parallel_filter_and_transform(data, threshold, executor, workers, transform=transform)
+
     result = []
-    for item in data:
-        if item > threshold:
-            # Inefficient: Creates new string object on each concatenation
-            transformed = ""
-            for char in str(item):
-                transformed = transformed + char.upper()
-            result.append(transformed)
+    for batch in transform_batches(data, threshold, transform):
+        result.extend(batch)
     return result
 
 
-def process_large_dataset(data, operations):
+def _statistics_from_counts(counts, total, count):
+    """
+    Mean, median and mode from a frequency table.
+
+    Only the distinct values are sorted, so this stays cheap for data
+    with many repeats. Mode ties go to the smallest value, matching
+    calculate_statistics.
+    """
+    if not count:
+        return {"mean": None, "median": None, "mode": None}
+
+    keys = sorted(counts)
+    # Walk the cumulative counts to the middle position(s)
+    lower_rank, upper_rank = (count - 1) // 2, count // 2
+    lower = upper = None
+    seen = 0
+    for key in keys:
+        seen += counts[key]
+        if lower is None and seen > lower_rank:
+            lower = key
+        if seen > upper_rank:
+            upper = key
+            break
+    median = lower if count % 2 == 1 else (lower + upper) / 2
+
+    top = max(counts.values())
+    mode = next(key for key in keys if counts[key] == top)
+
+    return {"mean": total / count, "median": median, "mode": mode}
+
+
+# Strided sample size for judging whether a frequency table pays off
+_DISTINCT_SAMPLE = 4096
+
+
+def _few_distinct(data):
+    """
+    Whether data repeats enough for a frequency table to beat a sort.
+
+    Counting beats sorting only when the distinct values are few (about
+    4x faster with 1,000 distinct values in 1M, slower once most values
+    are distinct). A strided sample of about 4096 values estimates it:
+    with s of n values sampled, r repeats in the sample estimate
+    s**2 / (2 * d) for d distinct values, so r * n > s**2 means fewer
+    than n / 2 distinct values. Unhashable items report False.
+    """
+    step = max(1, len(data) // _DISTINCT_SAMPLE)
+    sample = data[::step]
+    try:
+        repeats = len(sample) - len(set(sample))
+    except TypeError:
+        return False
+    if step == 1:
+        return 2 * repeats > len(sample)
+    return repeats * len(data) > len(sample) ** 2
+
+
+def process_large_dataset(
+    data,
+    operations,
+    presorted=False,
+    deadline=None,
+    progress=None,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+):
     """
     Apply multiple operations to a dataset.
 
-    This function combines all the inefficiencies above for
-    demonstration purposes on larger datasets.
+    Duplicates and statistics are answered one of two ways:
+    - Shared sort: the data is sorted at most once and that sorted
+      copy serves the median, the mode and the duplicate scan. Used
+      for sorted input and for data with mostly distinct values
+    - Frequency pass: a streaming pipeline (see pipeline.py) folds
+      every chunk into one frequency table, and only the distinct
+      values are sorted. Used for unsorted data with few distinct
+      values (see _few_distinct), and always with a deadline or
+      progress callback, since it works chunk by chunk
+    The filter needs the mean as its threshold; on the frequency path
+    it takes a second pass that filters and transforms chunk by chunk.
+
+    Input sizes, time per step and chunk counts are recorded in
+    metrics.REGISTRY.
 
     Args:
         data: List of numeric values
         operations: List of operation names to perform
+        presorted: Skip the sortedness check and treat data as sorted
+        deadline: Time budget in seconds; when it runs out, partial
+            results are returned instead of the exact ones. The
+            statistics pass then reads strided chunks (see
+            Pipeline.strided), so partial statistics estimate the whole
+            input; a partial filter covers a prefix
+        progress: Callback called as progress(processed, total) with
+            element counts after every chunk
+        chunk_size: Elements per chunk on the frequency path
 
     Returns:
-        Dictionary with results of each operation
+        Dictionary with results of each operation. With a deadline or
+        progress callback it also carries 'partial' (True when the
+        deadline cut the work short) and 'processed' element counts;
+        partial statistics are marked 'approximate' and include
+        'mean_stderr' and 'median_quantile_stderr' error estimates.
     """
+    _INPUT_ELEMENTS.observe(len(data))
+    if deadline is None and progress is None:
+        counted = "duplicates" in operations or "statistics" in operations
+        if counted and len(data):
+            presorted = presorted or _is_sorted(data)
+        if not counted or presorted or not _few_distinct(data):
+            return _process_sorted(data, operations, presorted)
+
+    from .formatting import upper_text
+    from .pipeline import Collect, Frequencies, Pipeline
+
+    stop_at = None if deadline is None else time.monotonic() + deadline
+    n = len(data)
+    passes = 1 + ("filter" in operations)
+    done = 0
+
+    def tick(elements):
+        _CHUNKS.inc()
+        if progress is not None:
+            progress(done + elements, n * passes)
+
+    def remaining():
+        return None if stop_at is None else max(stop_at - time.monotonic(), 0.0)
+
+    # Pass 1: count, sum and frequency table. Under a deadline the
+    # chunks are strided, so a cut-short pass has still sampled the
+    # whole input rather than a prefix of it (sorted input would make
+    # a prefix as biased as possible)
+    started = time.perf_counter()
+    stream = Pipeline(data, chunk_size)
+    counting = stream if deadline is None else Pipeline.strided(data, chunk_size)
+    first = counting.run(Frequencies(), deadline=remaining(), progress=tick)
+    frequencies = first.results[0]
+    done = first.elements
+    _FREQUENCIES_SECONDS.observe(time.perf_counter() - started)
+    complete = first.complete
+
+    # Pass 2: filter against the mean
+    filtered = []
+    if "filter" in operations and frequencies.count and complete:
+        started = time.perf_counter()
+        threshold = frequencies.total / frequencies.count  # Use mean as threshold
+        second = (
+            stream.above(threshold)
+            .map_batches(upper_text)
+            .run(Collect(), deadline=remaining(), progress=tick)
+        )
+        filtered = second.results[0]
+        done += second.elements
+        complete = second.complete
+        _FILTER_SECONDS.observe(time.perf_counter() - started)
+
+    results = {}
+    if "duplicates" in operations:
+        results["duplicates"] = frequencies.duplicates()
+
+    if "statistics" in operations:
+        statistics = frequencies.statistics()
+        count = frequencies.count
+        if count < n:
+            # Standard errors for k out of n values, with the finite
+            # population correction. The values are an evenly strided
+            # sample, which is at least as precise as a random one for
+            # sorted or drifting data; data periodic in the stride can
+            # still bias it.
+            fpc = (n - count) / n
+            squares = sum(seen * value * value for value, seen in frequencies.counts.items())
+            total = frequencies.total
+            variance = (squares - total * total / count) / (count - 1) if count > 1 else 0.0
+            statistics["approximate"] = True
+            statistics["mean_stderr"] = math.sqrt(max(variance, 0.0) / count * fpc)
+            statistics["median_quantile_stderr"] = 0.5 * math.sqrt(fpc / count)
+        results["statistics"] = statistics
+
+    if "filter" in operations:
+        results["filtered"] = filtered
+
+    if deadline is not None or progress is not None:
+        if not complete:
+            _PARTIAL_RUNS.inc()
+        results["partial"] = not complete
+        results["processed"] = {"elements": done, "total": n * passes}
+    return results
+
+
+def _process_sorted(data, operations, presorted):
+    """process_large_dataset with one shared sort; see there."""
     results = {}
+    started = time.perf_counter()
+
+    def lap(timings):
+        # Record the time since the previous step in this step's histogram
+        nonlocal started
+        now = time.perf_counter()
+        timings.observe(now - started)
+        started = now
+
+    if "duplicates" in operations and "statistics" in operations and len(data):
+        # Share one sort between median, mode and duplicates
+        sorted_data = _sorted_view(data, presorted)
+        presorted = True
+        lap(_SORT_SECONDS)
+    else:
+        sorted_data = data
 
     if "duplicates" in operations:
-        results["duplicates"] = find_duplicates(data)
+        results["duplicates"] = find_duplicates(sorted_data, presorted)
+        lap(_DUPLICATES_SECONDS)
 
     if "statistics" in operations:
-        results["statistics"] = calculate_statistics(data)
+        results["statistics"] = calculate_statistics(sorted_data, presorted)
+        lap(_STATISTICS_SECONDS)
 
     if "filter" in operations:
-        threshold = sum(data) / len(data)  # Use mean as threshold
+        threshold = sum(data) / len(data) if len(data) else 0  # Use mean as threshold
         results["filtered"] = filter_and_transform(data, threshold)
+        lap(_FILTER_SECONDS)
 
     return results
@@ -0,0 +1,204 @@
+"""
+Shard-and-merge execution of process_large_dataset.
+
+Each input file (shard) is reduced by a worker to a PartialState - a
+small, versioned, serializable summary - and the coordinator merges the
+partial states pairwise in a tree until one is left. Local worker
+processes stand in for remote nodes; anything that can move bytes
+between machines can carry the serialized states instead.
+"""
+
+import json
+import zlib
+from collections import Counter
+
+from .data_processor import _statistics_from_counts, filter_and_transform
+from .records import parse_number, read_columns
+
+
+class PartialState:
+    """
+    Mergeable summary of values for duplicates and statistics.
+
+    Holds the element count, their sum and a frequency table. The
+    frequency table answers duplicates, mode and the exact median, and
+    its size grows with the number of distinct values, not with the
+    number of elements. Shards, the CLI and pipeline.Frequencies all
+    fold their values into one. The sum is None once a non-numeric
+    value has been seen; duplicates still work for any hashable values.
+    """
+
+    VERSION = 1
+
+    def __init__(self, count=0, total=0, counts=None):
+        self.count = count
+        self.total = total
+        self.counts = counts if counts is not None else Counter()
+
+    @classmethod
+    def from_values(cls, values):
+        """Build the partial state of a list of numeric values."""
+        state = cls()
+        state.update(values)
+        return state
+
+    def update(self, values):
+        """Add a list or NumPy array of values."""
+        if hasattr(values, "tolist"):
+            values = values.tolist()
+        self.count += len(values)
+        if self.total is not None:
+            try:
+                self.total += sum(values)
+            except TypeError:
+                self.total = None
+        self.counts.update(values)
+        return self
+
+    def merge(self, other):
+        """Add another partial state into this one."""
+        self.count += other.count
+        if self.total is not None:
+            self.total = None if other.total is None else self.total + other.total
+        self.counts.update(other.counts)
+        return self
+
+    def duplicates(self):
+        """Values seen more than once, in order of first appearance."""
+        return [value for value, seen in self.counts.items() if seen > 1]
+
+    def statistics(self):
+        """Exact mean, median and mode (ties to the smallest value)."""
+        return _statistics_from_counts(self.counts, self.total, self.count)
+
+    def to_bytes(self):
+        """Serialize as compressed JSON tagged with the format version."""
+        payload = {
+            "version": self.VERSION,
+            "count": self.count,
+            "total": self.total,
+            "counts": list(self.counts.items()),
+        }
+        return zlib.compress(json.dumps(payload, separators=(",", ":")).encode())
+
+    @classmethod
+    def from_bytes(cls, blob):
+        """Deserialize a state written by to_bytes."""
+        payload = json.loads(zlib.decompress(blob))
+        if payload.get("version") != cls.VERSION:
+            raise ValueError(f"unsupported partial state version: {payload.get('version')}")
+        return cls(payload["count"], payload["total"], Counter(dict(payload["counts"])))
+
+    def results(self, operations):
+        """Finalize into the 'duplicates' and 'statistics' results."""
+        results = {}
+        if "duplicates" in operations:
+            results["duplicates"] = self.duplicates()
+        if "statistics" in operations:
+            results["statistics"] = self.statistics()
+        return results
+
+
+def load_shard(path, column="value"):
+    """
+    Read one numeric column of a CSV shard as a list.
+
+    Args:
+        path: CSV file with a header row
+        column: Name of the column to read
+
+    Returns:
+        List of numbers
+    """
+    values = read_columns(path, columns=[column])[column]
+    if hasattr(values, "tolist"):
+        return values.tolist()
+    if values and isinstance(values[0], str):
+        # Left as strings because some value is not a number; parsing
+        # raises the ValueError for it
+        return [parse_number(text) for text in values]
+    return values
+
+
+def _shard_partial(path, column):
+    """Worker task: reduce a shard to a serialized partial state."""
+    return PartialState.from_values(load_shard(path, column)).to_bytes()
+
+
+def _merge_pair(left, right):
+    """Worker task: merge two serialized partial states."""
+    return PartialState.from_bytes(left).merge(PartialState.from_bytes(right)).to_bytes()
+
+
+def _shard_filter(path, column, threshold):
+    """Worker task: filter and transform a shard against a threshold."""
+    return filter_and_transform(load_shard(path, column), threshold)
+
+
+def merge_tree(blobs, executor=None):
+    """
+    Merge serialized partial states pairwise, level by level.
+
+    Each level halves the number of states, so n shards take
+    log2(n) rounds; merges within a round run in parallel when an
+    executor is given.
+
+    Args:
+        blobs: List of serialized partial states
+        executor: Optional concurrent.futures executor for the merges
+
+    Returns:
+        The merged PartialState
+    """
+    if not blobs:
+        return PartialState()
+    level = list(blobs)
+    while len(level) > 1:
+        lefts, rights = level[0::2], level[1::2]
+        carry = [lefts.pop()] if len(lefts) > len(rights) else []
+        if executor is not None:
+            merged = list(executor.map(_merge_pair, lefts, rights))
+        else:
+            merged = list(map(_merge_pair, lefts, rights))
+        level = merged + carry
+    return PartialState.from_bytes(level[0])
+
+
+def run_sharded(paths, operations, column="value", workers=None):
+    """
+    Run process_large_dataset operations over many shard files.
+
+    Round 1 reduces every shard to a partial state in a worker and
+    merges them tree-wise. If "filter" is requested, round 2 sends the
+    global mean back to the workers, which filter their shards; the
+    filtered values are concatenated in shard order.
+
+    Args:
+        paths: List of CSV shard files
+        operations: List of operation names to perform
+        column: Numeric column to process in each shard
+        workers: Number of worker processes (default: CPU count)
+
+    Returns:
+        Dictionary with results of each operation, as returned by
+        process_large_dataset
+    """
+    # Imported here: concurrent.futures pulls in multiprocessing, which
+    # would slow down the startup of the command-line entry point
+    from concurrent.futures import ProcessPoolExecutor
+
+    paths = list(paths)
+    columns = [column] * len(paths)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        blobs = list(executor.map(_shard_partial, paths, columns))
+        state = merge_tree(blobs, executor)
+        results = state.results(operations)
+
+        if "filter" in operations:
+            results["filtered"] = []
+            if state.count:
+                threshold = state.total / state.count  # Use mean as threshold
+                thresholds = [threshold] * len(paths)
+                for filtered in executor.map(_shard_filter, paths, columns, thresholds):
+                    results["filtered"].extend(filtered)
+    return results
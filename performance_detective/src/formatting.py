@@ -0,0 +1,142 @@
+"""
+Batch transforms for filter_and_transform and transform_batches.
+
+A transform is any callable taking a chunk of filtered values (a list,
+or a NumPy array for array input) and returning the transformed chunk.
+The transform of filter_and_transform is "format each number as
+uppercase text", i.e. str(value).upper(). Two implementations:
+- upper_text: that transform as a list of str, driven from C by map
+  (integer arrays go through format_lines and one split). Exact for
+  any value, and what filter_and_transform uses by default
+- format_lines: the same text as one bytes block with a newline after
+  each value. Integers are formatted by vectorized digit extraction
+  into a preallocated byte buffer, so no per-value Python object is
+  created; use it with transform_batches to write text out in bulk
+
+Measured on 1M random ints against the original character-by-character
+loop: filter_and_transform is about 2x faster on a list and about 6x
+on an int array (creating one str object per value dominates), while
+format_lines through transform_batches on an int array is over 10x
+faster. The format-numbers benchmarks in test_formatting.py record
+these ratios.
+"""
+
+from ._optional import optional_import
+
+
+def upper_text(values):
+    """
+    str(value).upper() of every value.
+
+    Args:
+        values: List or NumPy array
+
+    Returns:
+        List of str
+    """
+    if getattr(values, "dtype", None) is not None and values.dtype.kind == "i":
+        # The digit engine plus one C-level split beats str() per value
+        return format_lines(values).decode().split("\n")[:-1]
+    if hasattr(values, "tolist"):
+        values = values.tolist()  # Python scalars format like the list path
+    return list(map(str.upper, map(str, values)))
+
+
+def format_lines(values):
+    """
+    Uppercase text of every value, one value per line.
+
+    Integers (int lists, integer arrays) go through the vectorized
+    digit engine when NumPy is installed; other values are formatted
+    with upper_text, so the bytes are the same either way.
+
+    Args:
+        values: List or NumPy array
+
+    Returns:
+        ASCII bytes, each value followed by a newline
+    """
+    from .data_processor import _int64_array
+
+    if not len(values):
+        return b""
+    ints = _int64_array(values)
+    if ints is None or ints.min() == _INT64_MIN:  # abs() of the minimum overflows
+        if hasattr(values, "tolist"):
+            values = values.tolist()  # upper_text would send int arrays back here
+        return ("\n".join(upper_text(values)) + "\n").encode()
+    return _int_lines(optional_import("numpy"), ints)
+
+
+_INT64_MIN = -(1 << 63)
+
+
+def _int_lines(np, ints):
+    """
+    Digit extraction for an int64 array.
+
+    Each value gets a row of a zeroed, preallocated buffer, as uint32
+    words of four characters, with a newline word at the end. Digits
+    are written right-aligned four at a time: one divmod by 10000 per
+    column for the whole array, then a lookup of the four ASCII bytes
+    in a table. The table has variants for the leading group of a value
+    (leading zeros left as NUL, room permitting a minus sign), so after
+    the last column dropping the NUL bytes leaves exactly the text.
+    """
+    table = _digit_table(np)
+    n = len(ints)
+    negative = ints < 0
+    magnitude = np.abs(ints)
+    largest = int(magnitude.max())
+    groups = len(str(largest)) // 4 + 1  # at least one spare character for the sign
+
+    words = np.zeros((n, groups + 1), dtype=np.uint32)
+    words[:, -1] = ord("\n")
+    remaining = magnitude.astype(np.uint32) if largest < 1 << 32 else magnitude
+    alive = np.ones(n, dtype=bool)  # digits left to write
+    sign_pending = np.zeros(n, dtype=bool)  # leading group was full, sign goes next
+    for column in range(groups - 1, -1, -1):
+        quotient, group = np.divmod(remaining, 10_000)
+        leading = alive & (quotient == 0)
+        signed = leading & negative & (group < 1000)
+        # Table variant 0, 1 or 2, kept in small unsigned types
+        variant = leading.view(np.uint8) + signed.view(np.uint8)
+        word = table[group + variant * np.uint32(10_000)]
+        if column < groups - 1:
+            done = np.flatnonzero(~alive)
+            word[done] = table[_EMPTY + sign_pending[done]]
+        words[:, column] = word
+        sign_pending = leading & negative & (group >= 1000)
+        alive &= ~leading
+        remaining = quotient
+
+    text = words.view(np.uint8).ravel()
+    return text[text != 0].tobytes()
+
+
+# Offsets into the digit table: 4 digits, leading group, leading group
+# with sign, then an empty word and a word holding only the sign
+_EMPTY = 30_000
+
+
+def _digit_table(np):
+    """The uint32 word for each digit group variant, cached."""
+    global _TABLE
+    if _TABLE is None:
+        def word(text):
+            return int.from_bytes(text.rjust(4, b"\0"), "little")
+
+        groups = [b"%04d" % group for group in range(10_000)]
+        leading = [group.lstrip(b"0") or b"0" for group in groups]
+        _TABLE = np.array(
+            [word(group) for group in groups]
+            + [word(text) for text in leading]
+            # Only groups under 1000 have room for the sign
+            + [word(b"-" + text) if len(text) < 4 else 0 for text in leading]
+            + [0, word(b"-")],
+            dtype=np.uint32,
+        )
+    return _TABLE
+
+
+_TABLE = None
@@ -0,0 +1,346 @@
+"""
+Metrics registry for production monitoring.
+
+Counters and latency histograms that the hot paths update once per
+call, never per element, so keeping them enabled costs well under 1%
+of the work they describe (see test_metrics.py). Histograms use fixed
+HDR-style log-linear buckets: every power of two is split into a few
+equal-width buckets, so the relative error of a bucket is bounded over
+many orders of magnitude, and an observation is one binary search
+over a precomputed list.
+
+Metrics are collected in REGISTRY and exported through sinks: any
+object with a write(registry) method. Two are provided:
+- PrometheusFileSink writes the Prometheus text format to a file,
+  e.g. for the node_exporter textfile collector
+- MemorySink keeps snapshots in memory, for tests and local inspection
+
+    from src.metrics import REGISTRY, PrometheusFileSink
+    REGISTRY.add_sink(PrometheusFileSink("/var/lib/node_exporter/detective.prom"))
+    ...
+    REGISTRY.export()
+"""
+
+import math
+import os
+import threading
+from bisect import bisect_left
+
+
+def log_linear_buckets(lowest, highest, sub_buckets=4):
+    """
+    HDR-style bucket upper bounds from lowest to at least highest.
+
+    Args:
+        lowest: Upper bound of the first bucket (> 0)
+        highest: Largest value that needs its own bucket
+        sub_buckets: Equal-width buckets per power of two
+
+    Returns:
+        Sorted list of bucket upper bounds
+    """
+    if lowest <= 0 or highest < lowest:
+        raise ValueError("buckets need 0 < lowest <= highest")
+    bounds = [lowest]
+    base = lowest
+    while bounds[-1] < highest:
+        bounds.extend(base * (1 + step / sub_buckets) for step in range(1, sub_buckets + 1))
+        base *= 2
+    return bounds
+
+
+# 1 microsecond to about 2 minutes, 4 buckets per doubling (<= 25% wide)
+LATENCY_BUCKETS = log_linear_buckets(1e-6, 120)
+# 1 to 2**32 elements, one bucket per doubling
+SIZE_BUCKETS = log_linear_buckets(1, 1 << 32, sub_buckets=1)
+
+
+class _CounterChild:
+    """One labelled time series of a counter."""
+
+    __slots__ = ("value", "_lock", "_registry")
+
+    def __init__(self, registry):
+        self.value = 0
+        self._lock = threading.Lock()
+        self._registry = registry
+
+    def inc(self, amount=1):
+        """Increase the counter."""
+        if self._registry.enabled:
+            with self._lock:
+                self.value += amount
+
+    def _reset(self):
+        with self._lock:
+            self.value = 0
+
+
+class _HistogramChild:
+    """One labelled time series of a histogram."""
+
+    __slots__ = ("bounds", "counts", "sum", "count", "_lock", "_registry")
+
+    def __init__(self, registry, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last bucket is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+        self._registry = registry
+
+    def observe(self, value):
+        """Record one observation."""
+        if self._registry.enabled:
+            index = bisect_left(self.bounds, value)
+            with self._lock:
+                self.counts[index] += 1
+                self.sum += value
+                self.count += 1
+
+    def _reset(self):
+        with self._lock:
+            self.counts = [0] * (len(self.bounds) + 1)
+            self.sum = 0.0
+            self.count = 0
+
+    def quantile(self, q):
+        """
+        Estimated q-quantile: the upper bound of the bucket holding it.
+
+        Returns:
+            The bucket bound (inf for the overflow bucket), or None
+            before any observation
+        """
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.bounds[index] if index < len(self.bounds) else math.inf
+        return math.inf
+
+
+class _Metric:
+    """A named metric family: one child per combination of label values."""
+
+    type = None
+
+    def __init__(self, registry, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._registry = registry
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, **labels):
+        """
+        The child for a set of label values.
+
+        Hot paths should look a child up once and keep it, rather than
+        calling labels() per update.
+        """
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def samples(self):
+        """(label dict, child) pairs."""
+        return [(dict(zip(self.labelnames, key)), child) for key, child in sorted(self._children.items())]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    type = "counter"
+
+    def _new_child(self):
+        return _CounterChild(self._registry)
+
+    def inc(self, amount=1):
+        """Increase an unlabelled counter."""
+        self.labels().inc(amount)
+
+
+class Histogram(_Metric):
+    """Distribution of observations over fixed buckets."""
+
+    type = "histogram"
+
+    def __init__(self, registry, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(registry, name, help, labelnames)
+        self.buckets = list(buckets)
+
+    def _new_child(self):
+        return _HistogramChild(self._registry, self.buckets)
+
+    def observe(self, value):
+        """Record one observation on an unlabelled histogram."""
+        self.labels().observe(value)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """
+    Collection of metrics and the sinks they are exported to.
+
+    Args:
+        enabled: When False, updates are dropped after a single
+            attribute check
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.metrics = {}
+        self.sinks = []
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name, help, labelnames, **options):
+        with self._lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = cls(self, name, help, labelnames, **options)
+            elif type(metric) is not cls or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"metric {name} is already registered with another type or labels")
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        """Get or create a counter."""
+        return self._register(Counter, name, help, labelnames)
+
+    def histogram(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        """Get or create a histogram."""
+        return self._register(Histogram, name, help, labelnames, buckets=buckets)
+
+    def reset(self):
+        """
+        Zero every metric, keeping the registrations.
+
+        Children are zeroed in place, so ones kept by hot paths stay live.
+        """
+        for metric in self.metrics.values():
+            for _, child in metric.samples():
+                child._reset()
+
+    def collect(self):
+        """
+        Snapshot of all values.
+
+        Returns:
+            Dict mapping metric name to {label tuple: value}, where the
+            label tuple holds (name, value) pairs; histogram values are
+            dicts with 'count', 'sum' and cumulative 'buckets'
+            [(upper bound, count)]
+        """
+        snapshot = {}
+        for name, metric in sorted(self.metrics.items()):
+            series = {}
+            for labels, child in metric.samples():
+                key = tuple(labels.items())
+                if metric.type == "counter":
+                    series[key] = child.value
+                else:
+                    with child._lock:
+                        counts, total, count = list(child.counts), child.sum, child.count
+                    cumulative, buckets = 0, []
+                    for bound, bucket_count in zip([*child.bounds, math.inf], counts):
+                        cumulative += bucket_count
+                        buckets.append((bound, cumulative))
+                    series[key] = {"count": count, "sum": total, "buckets": buckets}
+            snapshot[name] = series
+        return snapshot
+
+    def to_prometheus(self):
+        """All metrics in the Prometheus text exposition format."""
+        snapshot = self.collect()
+        lines = []
+        for name, metric in sorted(self.metrics.items()):
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.type}")
+            for key, value in snapshot[name].items():
+                labels = dict(key)
+                if metric.type == "counter":
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+                    continue
+                for bound, cumulative in value["buckets"]:
+                    bucket_labels = _format_labels({**labels, "le": _format_value(bound)})
+                    lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(value['sum'])}")
+                lines.append(f"{name}_count{_format_labels(labels)} {value['count']}")
+        return "\n".join(lines) + "\n"
+
+    def add_sink(self, sink):
+        """Export to a sink: any object with a write(registry) method."""
+        self.sinks.append(sink)
+
+    def remove_sink(self, sink):
+        self.sinks.remove(sink)
+
+    def export(self):
+        """Write the current metrics to every sink."""
+        for sink in self.sinks:
+            sink.write(self)
+
+
+class PrometheusFileSink:
+    """
+    Writes the Prometheus text format to a file.
+
+    The file is replaced atomically, so a scraper never reads a
+    half-written export.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def write(self, registry):
+        with open(self.path + ".tmp", "w") as out:
+            out.write(registry.to_prometheus())
+        os.replace(self.path + ".tmp", self.path)
+
+
+class MemorySink:
+    """Keeps every export in memory, for tests and local inspection."""
+
+    def __init__(self):
+        self.snapshots = []
+        self.texts = []
+
+    def write(self, registry):
+        self.snapshots.append(registry.collect())
+        self.texts.append(registry.to_prometheus())
+
+    def value(self, name, **labels):
+        """A metric's value in the latest export, or None when absent."""
+        series = self.snapshots[-1].get(name, {}) if self.snapshots else {}
+        for key, value in series.items():
+            if dict(key) == {name: str(value) for name, value in labels.items()}:
+                return value
+        return None
+
+
+# Process-wide registry used by the instrumented modules
+REGISTRY = MetricsRegistry()
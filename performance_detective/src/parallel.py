@@ -0,0 +1,243 @@
+"""
+Chunked parallel execution for find_duplicates, calculate_statistics
+and filter_and_transform.
+
+The data is cut into chunks, each task reduces its chunk to its own
+partial state, and the partial states are merged once all tasks are
+done, so no state is shared between workers while they run.
+
+Two executors:
+- threads: chunks are views of one array, nothing is copied or
+  pickled. Numeric data runs through NumPy kernels (np.unique, sum)
+  that release the GIL, so threads run them in parallel; the pure
+  Python kernels used for other data only run in parallel on
+  free-threaded CPython 3.13+
+- processes: every chunk and partial state is pickled to and from a
+  worker process, which costs copies but runs any kernel in parallel
+
+test_parallel.py benchmarks both against each other on one machine.
+"""
+
+import os
+import sys
+from collections import Counter
+from functools import partial
+from itertools import repeat
+
+from ._optional import optional_import
+from .data_processor import _int64_array, _statistics_from_counts, filter_and_transform
+
+EXECUTORS = ("threads", "processes")
+
+# Aim for a few chunks per worker, so uneven chunks balance out
+CHUNKS_PER_WORKER = 4
+
+
+def gil_enabled():
+    """False on free-threaded CPython builds running without the GIL."""
+    check = getattr(sys, "_is_gil_enabled", None)
+    return True if check is None else check()
+
+
+def _pool(executor, workers):
+    """
+    A context manager yielding the executor to use.
+
+    Executor instances are used as they are and left open, so callers
+    can reuse one pool across calls.
+    """
+    if executor == "threads":
+        from concurrent.futures import ThreadPoolExecutor
+
+        return ThreadPoolExecutor(max_workers=workers)
+    if executor == "processes":
+        from concurrent.futures import ProcessPoolExecutor
+
+        return ProcessPoolExecutor(max_workers=workers)
+    if hasattr(executor, "map"):
+        return _Borrowed(executor)
+    raise ValueError(f"executor must be one of {EXECUTORS} or an Executor, got {executor!r}")
+
+
+class _Borrowed:
+    """Context manager around an executor owned by the caller."""
+
+    def __init__(self, executor):
+        self.executor = executor
+
+    def __enter__(self):
+        return self.executor
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+def _chunks(data, workers, chunk_size):
+    """Slices of data (views for NumPy arrays)."""
+    if chunk_size is None:
+        workers = workers or os.cpu_count() or 1
+        chunk_size = max(1, -(-len(data) // (workers * CHUNKS_PER_WORKER)))
+    return [data[start:start + chunk_size] for start in range(0, len(data), chunk_size)]
+
+
+def _numeric_array(np, data):
+    """
+    Data as an int64 or float64 array for the NumPy kernels, else None.
+
+    Integer data whose sum could overflow int64 is left to the exact
+    Python kernels.
+    """
+    if hasattr(data, "dtype"):
+        if data.dtype.kind == "f":
+            return data.astype(np.float64, copy=False)
+        array = _int64_array(data)
+    else:
+        kinds = set(map(type, data))
+        if kinds == {float}:
+            return np.array(data, dtype=np.float64)
+        array = _int64_array(data) if kinds == {int} else None
+    if array is not None and len(array):
+        largest = max(abs(int(array.min())), abs(int(array.max())))
+        if largest * len(array) >= 1 << 63:
+            return None
+    return array
+
+
+def _array_partial(chunk):
+    """Task: (count, sum, sorted distinct values, their counts) of an array chunk."""
+    np = optional_import("numpy")
+    values, counts = np.unique(chunk, return_counts=True)
+    return len(chunk), chunk.sum().item(), values, counts
+
+
+def _counter_partial(chunk):
+    """Task: (count, sum, Counter) of a list chunk; the sum is None for non-numbers."""
+    try:
+        total = sum(chunk)
+    except TypeError:
+        total = None
+    return len(chunk), total, Counter(chunk)
+
+
+def _merge_array_partials(np, partials):
+    """Merge array partials into (count, sum, distinct values, counts)."""
+    count = sum(state[0] for state in partials)
+    total = sum(state[1] for state in partials)
+    values, inverse = np.unique(np.concatenate([state[2] for state in partials]), return_inverse=True)
+    counts = np.bincount(
+        inverse, weights=np.concatenate([state[3] for state in partials]), minlength=len(values)
+    ).astype(np.int64)
+    return count, total, values, counts
+
+
+def _merge_counter_partials(partials):
+    """Merge Counter partials into (count, sum, None, Counter)."""
+    count = 0
+    total = 0
+    counts = Counter()
+    for chunk_count, chunk_total, chunk_counts in partials:
+        count += chunk_count
+        total = None if total is None or chunk_total is None else total + chunk_total
+        counts.update(chunk_counts)
+    return count, total, None, counts
+
+
+def _reduce(data, executor, workers, chunk_size):
+    """
+    Reduce data to one merged partial state in parallel.
+
+    Returns:
+        (count, sum, values, counts): values and counts are NumPy
+        arrays of the distinct values and their counts, or values is
+        None and counts is a Counter when the Python kernels ran
+    """
+    np = optional_import("numpy")
+    array = _numeric_array(np, data) if np is not None else None
+    source = array if array is not None else data
+    with _pool(executor, workers) as pool:
+        kernel = _array_partial if array is not None else _counter_partial
+        partials = list(pool.map(kernel, _chunks(source, workers, chunk_size)))
+    if array is not None:
+        return _merge_array_partials(np, partials)
+    return _merge_counter_partials(partials)
+
+
+def parallel_find_duplicates(items, executor="threads", workers=None, chunk_size=None):
+    """
+    find_duplicates over chunks in parallel.
+
+    Args:
+        items: List or array of hashable items
+        executor: "threads", "processes" or a concurrent.futures executor
+        workers: Number of workers (default: CPU count)
+        chunk_size: Items per task (default: a few chunks per worker)
+
+    Returns:
+        Sorted list of duplicate items for numeric data, otherwise a
+        list in no particular order (each duplicate appears once)
+    """
+    if not len(items):
+        return []
+    _, _, values, counts = _reduce(items, executor, workers, chunk_size)
+    if values is not None:
+        return values[counts > 1].tolist()
+    return [item for item, seen in counts.items() if seen > 1]
+
+
+def parallel_calculate_statistics(data, executor="threads", workers=None, chunk_size=None):
+    """
+    calculate_statistics over chunks in parallel.
+
+    The chunks are reduced to frequency tables, so the median and mode
+    are exact; only the order of the floating-point additions of the
+    mean differs from the sequential version.
+
+    Args:
+        data: List or array of numeric values
+        executor: "threads", "processes" or a concurrent.futures executor
+        workers: Number of workers (default: CPU count)
+        chunk_size: Values per task (default: a few chunks per worker)
+
+    Returns:
+        Dictionary with 'mean', 'median', and 'mode' keys
+    """
+    if not len(data):
+        return {"mean": None, "median": None, "mode": None}
+    count, total, values, counts = _reduce(data, executor, workers, chunk_size)
+    if values is None:
+        return _statistics_from_counts(counts, total, count)
+
+    np = optional_import("numpy")
+    # Walk the cumulative counts to the middle position(s), as
+    # _statistics_from_counts does
+    cumulative = np.cumsum(counts)
+    lower, upper = values[np.searchsorted(cumulative, [(count - 1) // 2, count // 2], side="right")].tolist()
+    median = lower if count % 2 == 1 else (lower + upper) / 2
+    # argmax takes the first of tied counts, i.e. the smallest value
+    mode = values[np.argmax(counts)].item()
+    return {"mean": total / count, "median": median, "mode": mode}
+
+
+def parallel_filter_and_transform(
+    data, threshold, executor="threads", workers=None, chunk_size=None, transform=None
+):
+    """
+    filter_and_transform over chunks in parallel, keeping input order.
+
+    Args:
+        data: List of numeric values
+        threshold: Minimum value to include
+        executor: "threads", "processes" or a concurrent.futures executor
+        workers: Number of workers (default: CPU count)
+        chunk_size: Values per task (default: a few chunks per worker)
+        transform: Batch transform for filter_and_transform; must be
+            picklable (a module-level function) for processes
+
+    Returns:
+        List of transformed string values
+    """
+    chunks = _chunks(data, workers, chunk_size)
+    with _pool(executor, workers) as pool:
+        task = partial(filter_and_transform, transform=transform)
+        parts = pool.map(task, chunks, repeat(threshold))
+        return [value for part in parts for value in part]
@@ -0,0 +1,357 @@
+"""
+Composable pipelines over chunked streams.
+
+A pipeline is a source, a list of stages and, when it runs, one or
+more sinks:
+
+    from src.pipeline import Pipeline, Statistics, TopK
+
+    stats, top = (
+        Pipeline.from_file("data/sample_data.csv", column="value")
+        .above(500)
+        .dedup()
+        .run(Statistics(), TopK(10))
+        .results
+    )
+
+Nothing is read until run(). The source is then read once, a chunk at
+a time, and every chunk flows through all stages into every sink
+before the next chunk is read, so memory is bounded by the chunk size
+plus what the stages and sinks keep (dedup and the frequency sinks
+keep one entry per distinct value).
+
+Stages are fused: consecutive item stages (filter, above, map) become
+one chain of C-level filter/map iterators per chunk, so no
+intermediate list is built between them; above() on NumPy chunks is a
+boolean mask. Batch stages (map_batches, dedup) see a whole chunk.
+"""
+
+import heapq
+import time
+from collections import namedtuple
+from functools import partial
+from itertools import chain, filterfalse, islice
+from operator import lt
+
+from .data_processor import DEFAULT_CHUNK_SIZE
+from .distributed import PartialState
+from .formatting import format_lines
+from .records import csv_chunks, line_chunks
+
+Run = namedtuple("Run", ["results", "complete", "elements"])
+Run.__doc__ = """
+Outcome of Pipeline.run.
+
+results: One result per sink, in the order the sinks were given
+complete: False when the deadline stopped the run before the source ended;
+    for files and iterators, whose end is only seen once a chunk comes
+    up short, a deadline hit on a full last chunk also gives False
+elements: Number of source elements read
+"""
+
+
+class Pipeline:
+    """
+    Lazily evaluated, chunked stream of values.
+
+    Stage methods return a new pipeline, so a pipeline can be extended
+    in different ways and run more than once (if its source can be
+    read more than once).
+
+    Args:
+        source: A list, NumPy array or other sequence (read in slices,
+            re-readable), or any other iterable such as a generator
+            (read once)
+        chunk_size: Values per chunk
+    """
+
+    def __init__(self, source, chunk_size=DEFAULT_CHUNK_SIZE, _stages=()):
+        self.source = source
+        self.chunk_size = chunk_size
+        self.stages = tuple(_stages)
+
+    @classmethod
+    def from_file(cls, path, column=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Pipeline over a text file, read a chunk at a time on every run.
+
+        Args:
+            path: CSV file with a header row when column is given,
+                otherwise a file with one number per line
+            column: CSV column to read
+            chunk_size: Values per chunk
+        """
+        return cls(_FileSource(path, column), chunk_size)
+
+    @classmethod
+    def strided(cls, data, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Pipeline over a sequence read in strided chunks.
+
+        With m chunks, chunk k holds data[k::m], so the chunks read
+        before a deadline are an evenly spread sample of the whole
+        sequence instead of a prefix. Values arrive out of order.
+
+        Args:
+            data: List, NumPy array or other sliceable sequence
+            chunk_size: Most values per chunk
+        """
+        return cls(_StridedSource(data), chunk_size)
+
+    def _with(self, stage):
+        return Pipeline(self.source, self.chunk_size, self.stages + (stage,))
+
+    def filter(self, predicate):
+        """Keep values for which predicate(value) is true."""
+        return self._with(("filter", predicate))
+
+    def above(self, threshold):
+        """Keep values greater than threshold (vectorized for arrays)."""
+        return self._with(("above", threshold))
+
+    def map(self, func):
+        """Replace every value with func(value)."""
+        return self._with(("map", func))
+
+    def map_batches(self, func):
+        """Replace every chunk with func(chunk), e.g. a vectorized transform."""
+        return self._with(("batch", func))
+
+    def dedup(self):
+        """Keep only the first occurrence of every value in the stream."""
+        return self._with(("dedup", None))
+
+    def chunks(self):
+        """
+        Iterate over the transformed chunks.
+
+        Empty chunks (everything filtered out) are skipped.
+        """
+        steps = _compile(self.stages)
+        chunks, _ = self._source_chunks()
+        for chunk in chunks:
+            for step in steps:
+                chunk = step(chunk)
+            if len(chunk):
+                yield chunk
+
+    def run(self, *sinks, deadline=None, progress=None):
+        """
+        Stream the source through the stages into the sinks.
+
+        Args:
+            *sinks: Objects with update(chunk) and result() methods
+            deadline: Time budget in seconds; once it has run out the
+                run stops after the current chunk
+            progress: Callback called as progress(elements) with the
+                number of source elements read, after every chunk
+
+        Returns:
+            Run with the sink results
+        """
+        stop_at = None if deadline is None else time.monotonic() + deadline
+        steps = _compile(self.stages)
+        source, total = self._source_chunks()
+        elements = 0
+        complete = True
+        for chunk in source:
+            read = len(chunk)
+            elements += read
+            for step in steps:
+                chunk = step(chunk)
+            if len(chunk):
+                for sink in sinks:
+                    sink.update(chunk)
+            if progress is not None:
+                progress(elements)
+            if stop_at is not None and time.monotonic() >= stop_at:
+                # Stopped early only if something was left to read.
+                # Reading ahead would lose a chunk of a one-shot
+                # source, so files and iterators count as complete
+                # only after a short chunk
+                complete = elements >= total if total is not None else read < self.chunk_size
+                break
+        return Run([sink.result() for sink in sinks], complete, elements)
+
+    def _source_chunks(self):
+        """The source as chunks, with its length (None when unknown)."""
+        source, size = self.source, self.chunk_size
+        if isinstance(source, _FileSource):
+            return source.chunks(size), None
+        if isinstance(source, _StridedSource):
+            return source.chunks(size), len(source.data)
+        if hasattr(source, "__getitem__") and hasattr(source, "__len__"):
+            return (source[start:start + size] for start in range(0, len(source), size)), len(source)
+        iterator = iter(source)
+        return iter(lambda: list(islice(iterator, size)), []), None
+
+
+class _FileSource:
+    """A file read afresh on every run."""
+
+    def __init__(self, path, column):
+        self.path = path
+        self.column = column
+
+    def chunks(self, chunk_size):
+        with open(self.path, newline="") as textfile:
+            if self.column is None:
+                yield from line_chunks(textfile, chunk_size)
+            else:
+                yield from csv_chunks(textfile, self.column, chunk_size)
+
+
+class _StridedSource:
+    """A sequence read as interleaved chunks."""
+
+    def __init__(self, data):
+        self.data = data
+
+    def chunks(self, chunk_size):
+        count = -(-len(self.data) // chunk_size)
+        return (self.data[offset::count] for offset in range(count))
+
+
+def _compile(stages):
+    """
+    Turn stages into per-chunk steps, fusing runs of item stages.
+
+    Called once per run, so stateful steps (dedup) start empty.
+    """
+    steps = []
+    fused = []
+    for kind, argument in stages:
+        if kind in ("filter", "above", "map"):
+            fused.append((kind, argument))
+            continue
+        if fused:
+            steps.append(partial(_fused_step, tuple(fused)))
+            fused = []
+        steps.append(argument if kind == "batch" else _dedup_step())
+    if fused:
+        steps.append(partial(_fused_step, tuple(fused)))
+    return steps
+
+
+def _fused_step(ops, chunk):
+    """Apply a run of item stages to a chunk in one pass."""
+    if hasattr(chunk, "dtype"):
+        # Leading threshold filters stay vectorized
+        while ops and ops[0][0] == "above":
+            chunk = chunk[chunk > ops[0][1]]
+            ops = ops[1:]
+        if not ops:
+            return chunk
+        chunk = chunk.tolist()
+    items = iter(chunk)
+    for kind, argument in ops:
+        if kind == "map":
+            items = map(argument, items)
+        elif kind == "above":
+            items = filter(partial(lt, argument), items)  # threshold < item
+        else:
+            items = filter(argument, items)
+    return list(items)
+
+
+def _dedup_step():
+    """A step keeping first occurrences, remembering values across chunks."""
+    seen = set()
+
+    def dedup(chunk):
+        if hasattr(chunk, "tolist"):
+            chunk = chunk.tolist()
+        # dict.fromkeys drops repeats within the chunk, keeping order
+        fresh = list(filterfalse(seen.__contains__, dict.fromkeys(chunk)))
+        seen.update(fresh)
+        return fresh
+
+    return dedup
+
+
+class Frequencies(PartialState):
+    """
+    Sink counting values into a distributed.PartialState: count, sum
+    and a frequency table.
+
+    One table answers statistics and duplicates, so a pipeline that
+    needs both counts every value once. The result is the sink itself,
+    which can be merged with, or serialized like, any other partial
+    state.
+    """
+
+    def result(self):
+        return self
+
+
+class Statistics(Frequencies):
+    """Sink for mean, median and mode, as calculate_statistics returns them."""
+
+    def result(self):
+        return self.statistics()
+
+
+class Duplicates(Frequencies):
+    """Sink for the values seen more than once."""
+
+    def result(self):
+        return self.duplicates()
+
+
+class TopK:
+    """
+    Sink keeping the k largest values.
+
+    Args:
+        k: Number of values to keep
+        key: Optional sort key, as for heapq.nlargest
+    """
+
+    def __init__(self, k, key=None):
+        self.k = k
+        self.key = key
+        self.top = []
+
+    def update(self, chunk):
+        self.top = heapq.nlargest(self.k, chain(self.top, chunk), key=self.key)
+
+    def result(self):
+        """The k largest values, largest first."""
+        return self.top
+
+
+class Collect:
+    """Sink gathering every value into a list."""
+
+    def __init__(self):
+        self.values = []
+
+    def update(self, chunk):
+        self.values.extend(chunk.tolist() if hasattr(chunk, "tolist") else chunk)
+
+    def result(self):
+        return self.values
+
+
+class Writer:
+    """
+    Sink writing each chunk to a binary stream.
+
+    Args:
+        stream: Binary file object
+        transform: Chunk to bytes (default: formatting.format_lines,
+            one uppercase value per line)
+    """
+
+    def __init__(self, stream, transform=format_lines):
+        self.stream = stream
+        self.transform = transform
+        self.written = 0
+
+    def update(self, chunk):
+        self.stream.write(self.transform(chunk))
+        self.written += len(chunk)
+
+    def result(self):
+        """Number of values written."""
+        return self.written
@@ -0,0 +1,220 @@
+"""
+Record-level duplicate detection over columnar data.
+
+find_duplicates works on flat lists of scalars. Real inputs such as
+data/sample_data.csv are tables, where a duplicate is a row whose key
+columns - e.g. (value, category), or every column except id - match
+another row. Tables are handled column-wise here: a mapping of column
+name to a sequence or NumPy array of equal length.
+
+The CSV readers shared by the CLI, the shards and the pipelines live
+here too: read_columns for whole tables, csv_chunks and line_chunks
+for streaming one numeric column, and parse_number for their fields.
+"""
+
+import csv
+import os
+from itertools import islice
+
+from ._optional import optional_import
+
+
+def parse_number(text):
+    """Parse a CSV field as int when possible, otherwise float."""
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def _parse_column(values):
+    """A column's values as numbers when all of them parse, as pandas reads it; else the strings."""
+    try:
+        return [parse_number(text) for text in values]
+    except ValueError:
+        return values
+
+
+def read_columns(path, columns=None):
+    """
+    Read a CSV file, or a columnar directory, into columns.
+
+    CSV files use pandas' C parser when pandas is installed, otherwise
+    the csv module; either way a column whose values all parse as
+    numbers holds numbers, so "1" and "1.0" compare equal. A directory
+    is read as the columnar format written by datagen: one .npy file
+    per column, memory-mapped rather than loaded, which requires NumPy.
+
+    Args:
+        path: CSV file with a header row, or columnar directory
+        columns: Optional list of column names to keep
+
+    Returns:
+        Dictionary mapping column name to a NumPy array or list
+    """
+    if os.path.isdir(path):
+        np = optional_import("numpy")
+        if np is None:
+            raise ImportError("reading columnar directories requires NumPy")
+        names = sorted(name[:-4] for name in os.listdir(path) if name.endswith(".npy"))
+        return {
+            name: np.load(os.path.join(path, name + ".npy"), mmap_mode="r")
+            for name in names
+            if columns is None or name in columns
+        }
+
+    pd = optional_import("pandas")
+    if pd is not None:
+        frame = pd.read_csv(path, usecols=columns)
+        return {name: frame[name].to_numpy() for name in frame.columns}
+
+    with open(path, newline="") as csvfile:
+        reader = csv.reader(csvfile)
+        header = next(reader)
+        wanted = [i for i, name in enumerate(header) if columns is None or name in columns]
+        values = [[] for _ in wanted]
+        for row in reader:
+            for out, i in zip(values, wanted):
+                out.append(row[i])
+    return {header[i]: _parse_column(out) for i, out in zip(wanted, values)}
+
+
+def csv_chunks(stream, column, chunk_size):
+    """Numeric chunks from one column of a CSV stream with a header."""
+    reader = csv.reader(stream)
+    header = next(reader, None)
+    if header is None:
+        return
+    try:
+        index = header.index(column)
+    except ValueError:
+        raise ValueError(f"column {column!r} not in header {header}") from None
+    while True:
+        rows = list(islice(reader, chunk_size))
+        if not rows:
+            return
+        yield [parse_number(row[index]) for row in rows]
+
+
+def line_chunks(lines, chunk_size):
+    """Numeric chunks from one value per line, skipping blank lines."""
+    lines = iter(lines)
+    while True:
+        block = list(islice(lines, chunk_size))
+        if not block:
+            return
+        yield [parse_number(line) for line in block if line.strip()]
+
+
+def _key_columns(columns, keys, exclude):
+    """Resolve which columns make up the record key."""
+    if keys is None:
+        exclude = set(exclude or ())
+        keys = [name for name in columns if name not in exclude]
+    if not keys:
+        raise ValueError("no key columns to compare")
+    missing = [name for name in keys if name not in columns]
+    if missing:
+        raise KeyError(f"unknown columns: {missing}")
+    lengths = {len(columns[name]) for name in keys}
+    if len(lengths) > 1:
+        raise ValueError("key columns have different lengths")
+    return keys
+
+
+def _factorize(np, column):
+    """Dense integer codes for a column, plus its number of distinct values."""
+    column = np.asarray(column)
+    pd = optional_import("pandas")
+    if pd is not None:
+        # Hash-based and linear, faster than sorting for string columns
+        codes, uniques = pd.factorize(column, use_na_sentinel=False)
+        return codes.astype(np.int64, copy=False), len(uniques)
+    uniques, codes = np.unique(column, return_inverse=True)
+    return codes.astype(np.int64, copy=False), len(uniques)
+
+
+def _groups_vectorized(np, columns, keys):
+    """Duplicate row groups using array operations only."""
+    n = len(columns[keys[0]])
+    if n == 0:
+        return []
+
+    # Combine per-column codes into one int64 key with mixed-radix
+    # packing. This is a perfect hash: distinct rows never collide, so
+    # equal keys are exact matches and no confirmation pass is needed.
+    key = None
+    radix = 1
+    coded = [_factorize(np, columns[name]) for name in keys]
+    for codes, cardinality in coded:
+        radix *= max(cardinality, 1)
+        if radix >= 2**63:
+            key = None
+            break
+        key = codes if key is None else key * cardinality + codes
+
+    if key is not None:
+        order = np.argsort(key, kind="stable")
+        sorted_key = key[order]
+        differs = sorted_key[1:] != sorted_key[:-1]
+    else:
+        # Too many combinations to pack: sort on all code columns
+        code_columns = [codes for codes, _ in coded]
+        order = np.lexsort(code_columns[::-1])
+        differs = np.zeros(n - 1, dtype=bool)
+        for codes in code_columns:
+            ordered = codes[order]
+            differs |= ordered[1:] != ordered[:-1]
+
+    starts = np.concatenate(([0], np.flatnonzero(differs) + 1))
+    lengths = np.diff(np.append(starts, n))
+    repeated = lengths > 1
+
+    # Keep only rows of repeated keys, then slice them into groups in
+    # order of each group's first row
+    rows = order[np.repeat(repeated, lengths)].tolist()
+    lengths = lengths[repeated]
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    by_first_row = np.argsort(order[starts[repeated]], kind="stable")
+    return [
+        rows[offset:offset + length]
+        for offset, length in zip(offsets[by_first_row].tolist(), lengths[by_first_row].tolist())
+    ]
+
+
+def _groups_python(columns, keys):
+    """Duplicate row groups with a dictionary of key tuples."""
+    rows = {}
+    for index, key in enumerate(zip(*(columns[name] for name in keys))):
+        rows.setdefault(key, []).append(index)
+    return [group for group in rows.values() if len(group) > 1]
+
+
+def find_duplicate_rows(columns, keys=None, exclude=None):
+    """
+    Find groups of rows that share the same key.
+
+    Vectorized implementation: O(n log n) with NumPy
+    - Each key column is factorized to dense integer codes
+    - Codes are packed into a single int64 key per row, with no
+      per-row tuple objects
+    - A stable argsort brings equal keys together, and runs of equal
+      keys are the duplicate groups
+
+    Without NumPy, rows are grouped in a dictionary keyed by tuples.
+
+    Args:
+        columns: Mapping of column name to an equal-length sequence
+        keys: Column names forming the key (default: all columns)
+        exclude: Column names to leave out when keys is not given,
+            e.g. ["id"] to compare whole rows except the id
+
+    Returns:
+        List of duplicate groups, each a list of row indices in
+        ascending order; groups are ordered by their first row
+    """
+    keys = _key_columns(columns, keys, exclude)
+    np = optional_import("numpy")
+    if np is not None:
+        return _groups_vectorized(np, columns, keys)
+    return _groups_python(columns, keys)
@@ -0,0 +1,202 @@
+"""
+Sampling-based approximate statistics.
+
+Exploratory queries on very large inputs rarely need exact answers.
+These helpers draw a uniform sample in a single pass and estimate the
+mean, median, mode and duplicate rate from it, each with an interval.
+"""
+
+import math
+import random
+from collections import Counter
+from itertools import count, islice
+from statistics import NormalDist
+
+from .data_processor import _median_of_sorted
+
+# Sample size used when neither sample_size nor target_error is given
+DEFAULT_SAMPLE_SIZE = 10_000
+
+
+def _z_score(confidence):
+    """Two-sided normal critical value for a confidence level."""
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+def sample_size_for(target_error, confidence=0.95):
+    """
+    Sample size that bounds the median's quantile error.
+
+    The rank of the sample median is within z * 0.5 / sqrt(k) of the
+    true median's rank (as a fraction of n), whatever the distribution,
+    so target_error is expressed in quantile units: 0.01 means the
+    estimate lies between the 49th and 51st percentile.
+
+    Args:
+        target_error: Acceptable quantile error, between 0 and 0.5
+        confidence: Confidence level for the bound
+
+    Returns:
+        Number of elements to sample
+    """
+    if not 0 < target_error < 0.5:
+        raise ValueError("target_error must be between 0 and 0.5")
+    return math.ceil((_z_score(confidence) * 0.5 / target_error) ** 2)
+
+
+def reservoir_sample(iterable, k, rng=None):
+    """
+    Uniform sample of k elements from an iterable of unknown length.
+
+    Uses reservoir sampling with geometric skips (Algorithm L), so
+    elements that are not sampled are skipped at C speed by islice
+    instead of costing a random draw each.
+
+    Args:
+        iterable: Any iterable
+        k: Sample size
+        rng: random.Random instance (a fresh one is used if omitted)
+
+    Returns:
+        Tuple of (sample list, number of elements seen)
+    """
+    rng = rng or random.Random()
+    counter = count()
+    # zip pulls from iterable first, so counter ends at the element count
+    stream = zip(iterable, counter)
+    reservoir = [item for item, _ in islice(stream, k)]
+    if len(reservoir) < k or k == 0:
+        return reservoir, next(counter)
+
+    w = math.exp(math.log(rng.random()) / k)
+    while True:
+        skip = math.floor(math.log(rng.random()) / math.log(1 - w))
+        picked = next(islice(stream, skip, None), None)
+        if picked is None:
+            return reservoir, next(counter)
+        reservoir[rng.randrange(k)] = picked[0]
+        w *= math.exp(math.log(rng.random()) / k)
+
+
+def _sample_indices(n, k, rng):
+    """
+    k distinct indices from range(n).
+
+    For k much smaller than n, drawing with rng.choices and topping up
+    after collisions is several times faster than rng.sample, whose
+    per-draw cost is a Python-level call.
+    """
+    if k * 4 > n:
+        return rng.sample(range(n), k)
+    picked = set()
+    while len(picked) < k:
+        picked.update(rng.choices(range(n), k=k - len(picked)))
+    return picked
+
+
+def _draw_sample(data, k, rng):
+    """Index sampling for sequences, reservoir sampling for anything else."""
+    try:
+        n = len(data)
+        data[0:0]
+    except TypeError:
+        return reservoir_sample(data, k, rng)
+    if k >= n:
+        return list(data), n
+    return [data[i] for i in _sample_indices(n, k, rng)], n
+
+
+def approximate_statistics(
+    data, sample_size=None, target_error=None, confidence=0.95, seed=None
+):
+    """
+    Estimate mean, median, mode and duplicate rate from a sample.
+
+    Sequences are sampled by index; other iterables are read once with
+    reservoir sampling. Intervals are at the given confidence level:
+    - mean: normal interval with finite population correction
+    - median: distribution-free interval from sample order statistics
+    - mode_frequency: share of the population equal to the sample mode
+    - duplicate_rate: share of elements repeating an earlier value,
+      estimated with the GEE distinct-value estimator; its interval is
+      the range of distinct counts consistent with the sample
+
+    Args:
+        data: Sequence or iterable of numeric values
+        sample_size: Number of elements to sample
+        target_error: Quantile error for the median, used to derive the
+            sample size when sample_size is not given
+        confidence: Confidence level for the intervals
+        seed: Seed for reproducible samples
+
+    Returns:
+        Dictionary with 'mean', 'median', 'mode', 'duplicate_rate',
+        'intervals', 'sample_size', 'population_size' and 'confidence'
+    """
+    if sample_size is None:
+        sample_size = (
+            sample_size_for(target_error, confidence)
+            if target_error is not None
+            else DEFAULT_SAMPLE_SIZE
+        )
+
+    sample, n = _draw_sample(data, sample_size, random.Random(seed))
+    k = len(sample)
+    if not k:
+        return {
+            "mean": None,
+            "median": None,
+            "mode": None,
+            "duplicate_rate": None,
+            "intervals": {},
+            "sample_size": 0,
+            "population_size": n,
+            "confidence": confidence,
+        }
+
+    z = _z_score(confidence)
+    sample.sort()
+    # Finite population correction: intervals shrink to nothing at k == n
+    fpc = (n - k) / (n - 1) if n > 1 else 0.0
+
+    # Mean
+    mean = sum(sample) / k
+    variance = sum((x - mean) ** 2 for x in sample) / (k - 1) if k > 1 else 0.0
+    half_width = z * math.sqrt(variance / k * fpc)
+
+    # Median: ranks k/2 +- z*sqrt(k)/2 bracket the population median
+    rank_spread = z * math.sqrt(k * fpc) / 2
+    low_rank = max(0, math.floor((k - 1) / 2 - rank_spread))
+    high_rank = min(k - 1, math.ceil(k / 2 + rank_spread))
+
+    # Mode and its population share
+    counts = Counter(sample)
+    lengths = list(counts.values())
+    top = max(lengths)
+    share = top / k
+    share_spread = z * math.sqrt(share * (1 - share) / k * fpc)
+
+    # Duplicate rate from distinct counts: d distinct values in the
+    # sample, f1 of them seen once. GEE scales singletons by sqrt(n/k).
+    distinct = len(lengths)
+    singletons = lengths.count(1)
+    repeats = distinct - singletons
+    estimate = math.sqrt(n / k) * singletons + repeats
+    most = min(singletons * n / k + repeats, n - (k - distinct))
+    least = distinct
+
+    return {
+        "mean": mean,
+        "median": _median_of_sorted(sample),
+        "mode": next(value for value, seen in counts.items() if seen == top),
+        "duplicate_rate": 1 - min(max(estimate, least), most) / n,
+        "intervals": {
+            "mean": (mean - half_width, mean + half_width),
+            "median": (sample[low_rank], sample[high_rank]),
+            "mode_frequency": (max(0.0, share - share_spread), min(1.0, share + share_spread)),
+            "duplicate_rate": (1 - most / n, 1 - least / n),
+        },
+        "sample_size": k,
+        "population_size": n,
+        "confidence": confidence,
+    }
@@ -0,0 +1,134 @@
+"""
+Tests for the benchmark history store and HTML report.
+"""
+
+import json
+
+import pytest
+from src.benchreport import (
+    find_regressions,
+    ingest,
+    main,
+    measure_peak_memory,
+    read_history,
+    render_report,
+    split_name,
+)
+
+
+MACHINE = {"node": "bench-1", "cpu": {"brand_raw": "Test CPU"},
+           "python_implementation": "CPython", "python_version": "3.12.3"}
+
+
+def write_run(path, commit, when, means, machine=MACHINE, spread=0.01):
+    """Write a pytest-benchmark style JSON file"""
+    benchmarks = []
+    for name, mean in means.items():
+        params = {"backend": name.split("[")[1][:-1]} if "[" in name else None
+        benchmarks.append({
+            "name": name,
+            "group": None,
+            "params": params,
+            "extra_info": {"peak_memory": 4096} if name.endswith("_large") else {},
+            "stats": {"mean": mean, "median": mean, "min": mean * (1 - spread),
+                      "max": mean * (1 + spread), "stddev": mean * spread, "rounds": 10},
+        })
+    path.write_text(json.dumps({
+        "machine_info": machine,
+        "commit_info": {"id": commit * 10, "dirty": False, "branch": "main"},
+        "benchmarks": benchmarks,
+        "datetime": when,
+        "version": "4.0.0",
+    }))
+    return path
+
+
+def history_with(tmp_path, latest_means):
+    """Three steady runs followed by one with the given means"""
+    steady = {"test_find_duplicates_small": 1e-5, "test_find_duplicates_large": 1e-3,
+              "test_roll[python]": 2e-3, "test_roll[numpy]": 1e-4}
+    for index, commit in enumerate("abc"):
+        write_run(tmp_path / f"000{index}_{commit}.json", commit, f"2026-01-0{index + 1}T00:00:00", steady)
+    write_run(tmp_path / "0003_d.json", "d", "2026-01-04T00:00:00", {**steady, **latest_means})
+    return ingest([tmp_path], str(tmp_path / "history.jsonl"))
+
+
+def test_render_report(benchmark, tmp_path):
+    """Benchmark rendering a report with charts over the history"""
+    history = history_with(tmp_path, {})
+    page = benchmark.pedantic(render_report, args=(history,), rounds=3)
+    assert page.startswith("<!DOCTYPE html>")
+
+
+# Correctness tests (not benchmarked)
+class TestBenchReport:
+    """Test ingestion, regression detection and rendering"""
+
+    def test_history_keyed_by_commit_and_machine(self, tmp_path):
+        """A newer run of the same commit and machine replaces the older one"""
+        history_path = str(tmp_path / "history.jsonl")
+        write_run(tmp_path / "0001.json", "a", "2026-01-01T00:00:00", {"test_x": 1.0})
+        write_run(tmp_path / "0002.json", "a", "2026-01-02T00:00:00", {"test_x": 2.0})
+        other = {**MACHINE, "node": "bench-2"}
+        write_run(tmp_path / "0003.json", "a", "2026-01-03T00:00:00", {"test_x": 3.0}, machine=other)
+        (tmp_path / "notes.json").write_text("{}")
+
+        history = ingest([tmp_path], history_path)
+        assert [run["benchmarks"]["test_x"]["mean"] for run in history] == [2.0, 3.0]
+        assert [run["commit"] for run in history] == ["aaaaaaaaaa", "aaaaaaaaaa"]
+        assert read_history(history_path) == history
+        # Re-ingesting changes nothing
+        assert ingest([tmp_path], history_path) == history
+
+    def test_regressions_flagged(self, tmp_path):
+        """A clear slowdown is a regression; noise within the threshold is not"""
+        history = history_with(tmp_path, {"test_find_duplicates_large": 2e-3,
+                                          "test_find_duplicates_small": 1.05e-5})
+        statuses = {c["name"]: c["status"] for c in find_regressions(history)}
+        assert statuses["test_find_duplicates_large"] == "regression"
+        assert statuses["test_find_duplicates_small"] == "unchanged"
+
+        slow = [c for c in find_regressions(history) if c["status"] == "regression"]
+        assert slow[0]["change"] == pytest.approx(1.0)
+        assert slow[0]["commit"] == "dddddddddd"
+
+    def test_noisy_slowdown_not_flagged(self, tmp_path):
+        """Overlapping rounds do not count as a regression"""
+        history = history_with(tmp_path, {"test_find_duplicates_large": 1.2e-3})
+        history[-1]["benchmarks"]["test_find_duplicates_large"]["min"] = 0.9e-3
+        statuses = {c["name"]: c["status"] for c in find_regressions(history)}
+        assert statuses["test_find_duplicates_large"] == "unchanged"
+
+    def test_split_name(self):
+        """Sizes come from extra_info or the fixture suffix"""
+        assert split_name("test_find_duplicates_large") == ("find_duplicates", 10_000)
+        assert split_name("test_roll[numpy]", {"size": 50}) == ("roll", 50)
+        assert split_name("test_process_large_dataset") == ("process_large_dataset", None)
+
+    def test_report_highlights_regressions(self, tmp_path):
+        """The page lists regressions first and marks their rows"""
+        history = history_with(tmp_path, {"test_find_duplicates_large": 2e-3})
+        page = render_report(history)
+        assert "<h2>Regressions (1)</h2>" in page
+        assert page.index("Regressions") < page.index("Latest run")
+        assert '<tr class="regression"><td>test_find_duplicates_large' in page
+        assert "4 KiB" in page  # peak memory
+        if "matplotlib is not installed" not in page:
+            assert "Backend comparisons" in page
+            assert "data:image/png;base64," in page
+
+    def test_main_fail_on_regression(self, tmp_path, capsys):
+        """The command line writes the report and can fail on regressions"""
+        history_with(tmp_path, {"test_find_duplicates_large": 2e-3})
+        output = tmp_path / "report.html"
+        argv = [str(tmp_path), "--history", str(tmp_path / "history.jsonl"), "--output", str(output)]
+        main(argv)
+        assert output.exists()
+        assert "1 regression(s)" in capsys.readouterr().out
+        with pytest.raises(SystemExit):
+            main(argv + ["--fail-on-regression"])
+
+    def test_measure_peak_memory(self):
+        """Peak memory covers the call's allocations"""
+        peak = measure_peak_memory(lambda: bytearray(1_000_000))
+        assert peak >= 1_000_000
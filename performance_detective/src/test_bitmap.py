@@ -0,0 +1,156 @@
+"""
+Tests and benchmarks for compressed integer bitmaps.
+"""
+
+import random
+import sys
+from array import array
+
+import numpy as np
+import pytest
+from src.benchreport import measure_peak_memory
+from src.bitmap import ARRAY_MAX, IntBitmap, find_int_duplicates, is_dense
+from src.data_processor import find_duplicates
+
+
+@pytest.fixture
+def random_ids():
+    """2,000,000 random IDs below 1,500,000, so about half repeat"""
+    rng = random.Random(0)
+    return [rng.randrange(1_500_000) for _ in range(2_000_000)]
+
+
+@pytest.fixture
+def sparse_ids():
+    """500,000 random 40-bit IDs, 50,000 of them repeated"""
+    rng = random.Random(1)
+    ids = [rng.randrange(1 << 40) for _ in range(450_000)]
+    ids += rng.sample(ids, 50_000)
+    rng.shuffle(ids)
+    return ids
+
+
+def id_layouts():
+    """Realistic ID layouts: sequential, sequential with deletions, random in a range, sparse"""
+    rng = random.Random(2)
+    return {
+        "sequential": list(range(1_000_000)),
+        "deleted_30_percent": [i for i in range(1_400_000) if rng.random() < 0.7],
+        "random_below_4m": [rng.randrange(4_000_000) for _ in range(1_000_000)],
+        "sparse_40_bit": [rng.randrange(1 << 40) for _ in range(200_000)],
+    }
+
+
+def set_duplicates(items):
+    """Reference: the two-set algorithm"""
+    seen, duplicates = set(), set()
+    for item in items:
+        if item in seen:
+            duplicates.add(item)
+        else:
+            seen.add(item)
+    return duplicates
+
+
+def test_find_duplicates_int_bitmap(benchmark, random_ids):
+    """Benchmark find_duplicates on ints (bitmap path)"""
+    result = benchmark(find_duplicates, random_ids)
+    assert len(result) > 100_000
+
+
+def test_find_duplicates_int_sets(benchmark, random_ids):
+    """Benchmark the two-set algorithm on the same ints"""
+    result = benchmark(set_duplicates, random_ids)
+    assert len(result) > 100_000
+
+
+def test_find_duplicates_sparse_ids(benchmark, sparse_ids):
+    """Benchmark find_duplicates on sparse 40-bit IDs (routed to the sets)"""
+    result = benchmark(find_duplicates, sparse_ids)
+    assert len(result) >= 49_000
+
+
+def test_find_duplicates_sparse_ids_sets(benchmark, sparse_ids):
+    """Benchmark the two-set algorithm on the same sparse IDs"""
+    benchmark(set_duplicates, sparse_ids)
+
+
+def test_find_duplicates_sparse_ids_bitmap(benchmark, sparse_ids):
+    """Benchmark forcing the bitmap path on sparse IDs, to show why it is not used"""
+    values = np.array(sparse_ids, dtype=np.int64)
+    benchmark.pedantic(find_int_duplicates, args=(values,), rounds=1)
+
+
+# Correctness tests (not benchmarked)
+class TestIntBitmap:
+    """Test containers, batch operations and the duplicate finder"""
+
+    def test_matches_set_algorithm(self, random_ids):
+        """Bitmap duplicates equal the set-based duplicates"""
+        assert find_duplicates(random_ids) == sorted(set_duplicates(random_ids))
+
+    def test_negative_and_wide_values_across_batches(self):
+        """Negative values, far-apart chunks and repeats across batches"""
+        values = [-5, 2**40, 7, -5, 70_000, 2**40 + 1, 7, 2**40, -(2**62)] * 3
+        assert find_int_duplicates(values, batch_size=4) == sorted(set(values))
+        assert find_int_duplicates([1, 2, 3], batch_size=2) == []
+
+    def test_scalar_operations_and_container_switch(self):
+        """add/contains/iter work in both container kinds"""
+        bitmap = IntBitmap()
+        for value in range(0, 2 * (ARRAY_MAX + 10), 2):
+            bitmap.add(value)
+        bitmap.add(-3)
+        assert isinstance(bitmap.containers[0], bytearray)
+        assert len(bitmap) == ARRAY_MAX + 11
+        assert 4 in bitmap and 5 not in bitmap and -3 in bitmap
+        assert list(bitmap) == bitmap.to_list() == [-3, *range(0, 2 * (ARRAY_MAX + 10), 2)]
+
+    def test_batch_operations(self):
+        """contains_many agrees with scalar membership"""
+        bitmap = IntBitmap()
+        bitmap.add_many(np.arange(0, 20_000, 3, dtype=np.int64))
+        bitmap.add_many(np.arange(100_000, 100_010, dtype=np.int64))
+        probe = np.arange(-10, 110_000, 7, dtype=np.int64)
+        assert bitmap.contains_many(probe).tolist() == [int(v) in bitmap for v in probe]
+
+    def test_peak_memory_order_of_magnitude_smaller(self):
+        """4M shuffled IDs peak at over 10x less memory than the two sets"""
+        ids = list(range(4_000_000))
+        random.Random(3).shuffle(ids)
+        assert measure_peak_memory(find_duplicates, ids) * 10 < measure_peak_memory(set_duplicates, ids)
+
+    def test_peak_memory_by_layout(self, random_ids):
+        """Dense layouts peak below half the sets' memory; sparse ones keep the sets"""
+        layouts = id_layouts()
+        layouts["random_ids"] = random_ids
+        rng = random.Random(5)
+        for name, ids in layouts.items():
+            rng.shuffle(ids)
+            if name == "sparse_40_bit":
+                assert not is_dense(ids)
+                continue
+            assert is_dense(ids), name
+            assert measure_peak_memory(find_duplicates, ids) * 2 < measure_peak_memory(set_duplicates, ids), name
+
+    def test_nbytes_counts_container_overhead(self):
+        """Sparse values cost a container object each, and nbytes shows it"""
+        bitmap = IntBitmap()
+        bitmap.add_many(np.arange(0, 1000 << 16, 1 << 16, dtype=np.int64))
+        assert bitmap.nbytes > 1000 * sys.getsizeof(array("H", [0]))
+
+    def test_sparse_ids_keep_set_path(self, sparse_ids):
+        """Sparse IDs go to the sets and give the same duplicates"""
+        assert not is_dense(sparse_ids)
+        assert not is_dense(np.array(sparse_ids, dtype=np.int64))
+        assert not is_dense(["a", "b"]) and not is_dense([])
+        assert sorted(find_duplicates(sparse_ids)) == sorted(set_duplicates(sparse_ids))
+
+    def test_non_int_inputs_keep_set_path(self):
+        """bools, floats and huge ints are not routed to the bitmap"""
+        assert set(find_duplicates([True, 1, 2] * 40_000)) == {True, 2}
+        assert set(find_duplicates([2**70, 1] * 60_000)) == {2**70, 1}
+        assert set(find_duplicates([1.5, 2] * 60_000)) == {1.5, 2}
+        # Routing only looks at the first value; later ones fall back in the batch
+        assert find_duplicates(list(range(200_000)) + [1.5, 3]) == [3]
+        assert find_duplicates(list(range(200_000)) + [2**70, 5]) == [5]
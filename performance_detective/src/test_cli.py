@@ -0,0 +1,93 @@
+"""
+Tests and startup benchmarks for the python -m src command line.
+"""
+
+import io
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from src.cli import main
+from src.data_processor import process_large_dataset
+from src.distributed import load_shard
+
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+SAMPLE_CSV = PROJECT_ROOT / "data" / "sample_data.csv"
+
+
+def run_cli(*argv, stdin=""):
+    """Run main() in-process and parse its JSON output"""
+    out = io.StringIO()
+    main(list(argv), stdin=io.StringIO(stdin), stdout=out)
+    return json.loads(out.getvalue())
+
+
+def test_cli_cold_start(benchmark):
+    """Benchmark a short shell-pipeline invocation in a fresh interpreter"""
+    def invoke():
+        return subprocess.run(
+            [sys.executable, "-m", "src", "statistics", "-"],
+            input="1\n2\n3\n", capture_output=True, text=True, cwd=PROJECT_ROOT, check=True,
+        )
+
+    result = benchmark.pedantic(invoke, rounds=5)
+    assert json.loads(result.stdout)["statistics"]["median"] == 2
+
+
+def test_cli_does_not_import_heavy_dependencies():
+    """Importing the CLI leaves NumPy, pandas and multiprocessing unloaded"""
+    code = (
+        "import sys, src.cli; "
+        "print([m for m in ('numpy', 'pandas', 'matplotlib', 'multiprocessing') if m in sys.modules])"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, cwd=PROJECT_ROOT, check=True
+    ).stdout
+    assert output.strip() == "[]"
+
+
+# Correctness tests (not benchmarked)
+class TestCli:
+    """Test inputs, backends and chunking"""
+
+    @pytest.mark.parametrize("backend", ["python", "numpy"])
+    def test_csv_matches_process_large_dataset(self, backend):
+        """CSV input in small chunks gives the library's results"""
+        result = run_cli(
+            "duplicates", "statistics", "filter", str(SAMPLE_CSV),
+            "--chunk-size", "64", "--backend", backend,
+        )
+        expected = process_large_dataset(load_shard(SAMPLE_CSV), ["duplicates", "statistics", "filter"])
+        assert result["duplicates"] == sorted(expected["duplicates"])
+        assert result["statistics"] == expected["statistics"]
+        assert result["filtered"] == expected["filtered"]
+        assert result["rows"] == 1000
+
+    def test_stdin_lines_and_csv(self):
+        """stdin takes one value per line, or CSV with a header"""
+        assert run_cli("statistics", "filter", "-", stdin="4\n1\n\n2.5\n") == {
+            "statistics": {"mean": 2.5, "median": 2.5, "mode": 1},
+            "filtered": ["4"],
+            "rows": 3,
+        }
+        result = run_cli("duplicates", "--column", "b", "-", stdin="a,b\n1,7\n2,7\n")
+        assert result == {"duplicates": [7], "rows": 2}
+
+    def test_columnar_input(self, tmp_path):
+        """A columnar directory is read column-wise"""
+        np = pytest.importorskip("numpy")
+        (tmp_path / "cols").mkdir()
+        np.save(tmp_path / "cols" / "value.npy", np.array([3, 1, 3], dtype=np.int64))
+        result = run_cli("duplicates", "statistics", str(tmp_path / "cols"))
+        assert result["duplicates"] == [3]
+        assert result["statistics"]["median"] == 3
+
+    def test_rejects_unknown_operation_and_column(self):
+        """Bad arguments exit with an error"""
+        with pytest.raises(SystemExit):
+            run_cli("sort", "-")
+        with pytest.raises(SystemExit):
+            run_cli("statistics", "-", "--column", "missing", stdin="a,b\n1,2\n")
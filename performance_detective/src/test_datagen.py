@@ -0,0 +1,70 @@
+"""
+Tests and throughput benchmarks for the synthetic data generator.
+"""
+
+import numpy as np
+import pytest
+from src.datagen import generate, generate_chunk, _options
+from src.records import find_duplicate_rows, read_columns
+
+
+ROWS = 200_000
+
+
+@pytest.mark.parametrize("format", ["csv", "columnar"])
+def test_generate_throughput(benchmark, tmp_path, format):
+    """Benchmark generation; rows/s is recorded in extra_info"""
+    path = tmp_path / f"data.{format}"
+    stats = benchmark.pedantic(
+        generate, args=(path, ROWS), kwargs={"format": format, "seed": 1, "workers": 1}, rounds=3
+    )
+    benchmark.extra_info["rows_per_second"] = stats["rows_per_second"]
+    assert stats["rows"] == ROWS
+
+
+# Correctness tests (not benchmarked)
+class TestGenerate:
+    """Test determinism, formats and distribution options"""
+
+    def test_deterministic_across_workers_and_chunks(self, tmp_path):
+        """Output depends on the seed only, not on the worker count"""
+        generate(tmp_path / "one.csv", 5_000, seed=7, workers=1, chunk_rows=1_000)
+        generate(tmp_path / "two.csv", 5_000, seed=7, workers=2, chunk_rows=1_000)
+        assert (tmp_path / "one.csv").read_bytes() == (tmp_path / "two.csv").read_bytes()
+
+    def test_csv_and_columnar_agree(self, tmp_path):
+        """Both formats hold the same table in the sample_data.csv shape"""
+        generate(tmp_path / "data.csv", 3_000, seed=3, workers=1, chunk_rows=1_000)
+        generate(tmp_path / "cols", 3_000, format="columnar", seed=3, workers=1, chunk_rows=1_000)
+        csv_columns = read_columns(tmp_path / "data.csv")
+        npy_columns = read_columns(tmp_path / "cols")
+        assert list(csv_columns) == ["id", "value", "category", "score"]
+        for name in ["id", "value", "score"]:
+            assert np.array_equal(csv_columns[name], npy_columns[name])
+        assert csv_columns["category"].tolist() == npy_columns["category"].astype(str).tolist()
+        assert csv_columns["id"].tolist() == list(range(1, 3_001))
+        assert 0 <= csv_columns["score"].min() and csv_columns["score"].max() <= 100
+
+    def test_distribution_options(self):
+        """Zipf, duplicate ratio and category skew shape the data"""
+        options = _options(100_000, value_distribution="zipf", value_range=10**6)
+        values = generate_chunk(0, 0, 100_000, 1, options)["value"]
+        assert np.mean(values == 1) > 0.3
+
+        options = _options(100_000, value_range=10**12, duplicate_ratio=0.25)
+        chunk = generate_chunk(0, 0, 100_000, 1, options)
+        repeated = sum(len(group) - 1 for group in find_duplicate_rows(chunk, keys=["value"]))
+        assert repeated / 100_000 == pytest.approx(0.25, abs=0.01)
+
+        options = _options(100_000, category_skew=2.0)
+        categories = generate_chunk(0, 0, 100_000, 1, options)["category"]
+        assert np.mean(categories == b"A") > 0.6
+
+    def test_rejects_bad_options(self, tmp_path):
+        """Unknown formats and out-of-range options raise ValueError"""
+        with pytest.raises(ValueError):
+            generate(tmp_path / "x", 10, format="parquet")
+        with pytest.raises(ValueError):
+            _options(10, duplicate_ratio=1.5)
+        with pytest.raises(ValueError):
+            _options(10, value_distribution="normal")
@@ -0,0 +1,76 @@
+"""
+Tests for shard-and-merge execution with local worker processes.
+"""
+
+import csv
+from pathlib import Path
+
+import pytest
+from src import records
+from src.data_processor import process_large_dataset
+from src.distributed import PartialState, load_shard, merge_tree, run_sharded
+
+
+SAMPLE_CSV = Path(__file__).resolve().parent.parent / "data" / "sample_data.csv"
+
+
+@pytest.fixture
+def shards(tmp_path):
+    """sample_data.csv split into 5 shard files of uneven size"""
+    with open(SAMPLE_CSV, newline="") as csvfile:
+        rows = list(csv.reader(csvfile))
+    header, body = rows[0], rows[1:]
+    paths = []
+    for i, (start, end) in enumerate([(0, 100), (100, 350), (350, 600), (600, 610), (610, 1000)]):
+        path = tmp_path / f"shard_{i}.csv"
+        with open(path, "w", newline="") as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(header)
+            writer.writerows(body[start:end])
+        paths.append(path)
+    return paths
+
+
+def test_run_sharded_matches_single_process(shards):
+    """Merged shard results equal process_large_dataset on all rows"""
+    operations = ["duplicates", "statistics", "filter"]
+    result = run_sharded(shards, operations, workers=2)
+    expected = process_large_dataset(load_shard(SAMPLE_CSV), operations)
+    assert sorted(result["duplicates"]) == sorted(expected["duplicates"])
+    assert result["statistics"] == expected["statistics"]
+    assert result["filtered"] == expected["filtered"]
+
+
+def test_partial_state_round_trip():
+    """Serialized states restore exactly and merge like the union"""
+    left = PartialState.from_values([1, 2, 2, 3.5])
+    right = PartialState.from_values([3.5, 7])
+    restored = PartialState.from_bytes(left.to_bytes())
+    assert (restored.count, restored.total, restored.counts) == (4, 8.5, left.counts)
+
+    merged = merge_tree([left.to_bytes(), right.to_bytes(), PartialState().to_bytes()])
+    assert merged.results(["duplicates", "statistics"]) == {
+        "duplicates": [2, 3.5],
+        "statistics": {"mean": 19.0 / 6, "median": 2.75, "mode": 2},
+    }
+
+
+def test_partial_state_version_check():
+    """States from an unknown format version are rejected"""
+    blob = PartialState.from_values([1]).to_bytes()
+    PartialState.VERSION += 1
+    try:
+        with pytest.raises(ValueError):
+            PartialState.from_bytes(blob)
+    finally:
+        PartialState.VERSION -= 1
+
+
+def test_load_shard_without_pandas(tmp_path, monkeypatch):
+    """The csv fallback keeps floats and rejects non-numeric columns"""
+    path = tmp_path / "shard.csv"
+    path.write_text("value,category\n2.5,A\n3,B\n")
+    monkeypatch.setattr(records, "optional_import", lambda name: None)
+    assert load_shard(path) == [2.5, 3]
+    with pytest.raises(ValueError):
+        load_shard(path, column="category")
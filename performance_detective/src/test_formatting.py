@@ -0,0 +1,144 @@
+"""
+Tests and benchmarks for the batch transforms of filter_and_transform.
+"""
+
+import time
+
+import numpy as np
+import pytest
+from src.data_processor import filter_and_transform, transform_batches
+from src.formatting import format_lines, upper_text
+
+
+SIZE = 1_000_000
+
+
+def legacy_filter_and_transform(data, threshold):
+    """The original per-item loop, kept as the reference"""
+    result = []
+    for item in data:
+        if item > threshold:
+            transformed = ""
+            for char in str(item):
+                transformed = transformed + char.upper()
+            result.append(transformed)
+    return result
+
+
+def format_array(values, threshold):
+    """Filter and format an array into one block of text"""
+    return b"".join(transform_batches(values, threshold, format_lines))
+
+
+@pytest.fixture(scope="module")
+def int_array():
+    """1,000,000 random integers, positive and negative"""
+    return np.random.default_rng(4).integers(-10_000_000, 10_000_000, SIZE)
+
+
+@pytest.fixture(scope="module")
+def int_list(int_array):
+    return int_array.tolist()
+
+
+@pytest.fixture(scope="module")
+def legacy_seconds(int_list):
+    """One timing of the original loop, to record speedups against"""
+    started = time.perf_counter()
+    legacy_filter_and_transform(int_list, 0)
+    return time.perf_counter() - started
+
+
+def record_speedup(benchmark, legacy_seconds):
+    """Store the speedup over the original loop as extra_info["speedup"]"""
+    if benchmark.stats:
+        benchmark.extra_info["speedup"] = legacy_seconds / benchmark.stats.stats.min
+
+
+@pytest.mark.benchmark(group="format-numbers")
+def test_format_numbers_legacy_loop(benchmark, int_list):
+    """Benchmark the original per-item loop"""
+    benchmark.pedantic(legacy_filter_and_transform, args=(int_list, 0), rounds=3)
+
+
+@pytest.mark.benchmark(group="format-numbers")
+def test_format_numbers_upper_text(benchmark, int_list, legacy_seconds):
+    """Benchmark filter_and_transform on a list (about 2x the loop)"""
+    result = benchmark(filter_and_transform, int_list, 0)
+    assert len(result) > 0
+    record_speedup(benchmark, legacy_seconds)
+
+
+@pytest.mark.benchmark(group="format-numbers")
+def test_format_numbers_upper_text_array(benchmark, int_array, legacy_seconds):
+    """Benchmark filter_and_transform on an int array (about 6x the loop)"""
+    result = benchmark(filter_and_transform, int_array, 0)
+    assert len(result) > 0
+    record_speedup(benchmark, legacy_seconds)
+
+
+@pytest.mark.benchmark(group="format-numbers")
+def test_format_numbers_digit_engine(benchmark, int_array, legacy_seconds):
+    """Benchmark the vectorized digit engine into one block of text (target: 10x the loop)"""
+    text = benchmark(format_array, int_array, 0)
+    assert text.endswith(b"\n")
+    record_speedup(benchmark, legacy_seconds)
+
+
+# Correctness tests (not benchmarked)
+class TestFormatting:
+    """Test the transforms against the original loop"""
+
+    @pytest.mark.parametrize("data", [
+        [5, -3, 12, 0, 7, 12, -40000, 10 ** 30],
+        [0.5, 1e20, -2.25, float("inf"), float("nan"), 3.0],
+        [1, 2.5, True, 7],
+    ])
+    def test_default_transform_matches_loop(self, data):
+        """Same strings as the original loop, for ints, floats and mixed lists"""
+        assert filter_and_transform(data, 0) == legacy_filter_and_transform(data, 0)
+        assert filter_and_transform(data, 0.5) == legacy_filter_and_transform(data, 0.5)
+
+    def test_arrays_and_chunks(self):
+        """Array input and chunk boundaries give the same result as lists"""
+        values = list(range(-50, 50)) * 3
+        expected = legacy_filter_and_transform(values, 10)
+        assert filter_and_transform(np.array(values), 10) == expected
+        batches = list(transform_batches(values, 10, chunk_size=7))
+        assert len(batches) == 43
+        assert [text for batch in batches for text in batch] == expected
+
+    def test_digit_engine_matches_loop(self, int_array, int_list):
+        """The bytes block and the int array path hold the loop's text"""
+        values, expected = int_array[:50_000], legacy_filter_and_transform(int_list[:50_000], 0)
+        assert format_array(values, 0) == ("\n".join(expected) + "\n").encode()
+        assert filter_and_transform(values, 0) == expected
+
+    def test_iterable_input(self):
+        """Generators are filtered chunk by chunk, as the loop accepted them"""
+        expected = legacy_filter_and_transform(range(-20, 20), 3)
+        assert filter_and_transform((value for value in range(-20, 20)), 3) == expected
+        batches = list(transform_batches(iter(range(-20, 20)), 3, chunk_size=8))
+        assert [text for batch in batches for text in batch] == expected
+        assert filter_and_transform(iter([5, 1, 9]), 2, executor="threads") == ["5", "9"]
+
+    def test_format_lines_edges(self):
+        """Digit groups, signs and the int64 limits format exactly"""
+        values = [0, -1, 9, 10, -10, 999, -999, 1000, -1000, 9999, -9999, 10000, -10000,
+                  123456789, -123456789, 2 ** 62, -(2 ** 62), 2 ** 63 - 1, -(2 ** 63) + 1]
+        expected = ("\n".join(map(str, values)) + "\n").encode()
+        assert format_lines(values) == expected
+        assert format_lines(np.array(values)) == expected
+        assert format_lines(values + [-(2 ** 63)]) == expected + b"-9223372036854775808\n"
+        assert format_lines([1.5, 2, float("nan")]) == b"1.5\n2\nNAN\n"
+        assert format_lines([]) == b""
+
+    def test_custom_transform(self):
+        """Any batch callable can replace the default"""
+        def doubled(batch):
+            return [value * 2 for value in batch]
+
+        assert filter_and_transform([1, 5, 3, 8], 2, transform=doubled) == [10, 6, 16]
+        assert upper_text(np.array([1.5, 2.0])) == ["1.5", "2.0"]
+        assert upper_text(np.array([-(2 ** 63), 0, 7])) == ["-9223372036854775808", "0", "7"]
+        assert upper_text(np.array([], dtype=np.int64)) == []
@@ -0,0 +1,197 @@
+"""
+Tests for the metrics registry, and benchmarks of its overhead on the
+instrumented hot paths.
+"""
+
+import math
+import random
+import timeit
+
+import pytest
+from src import metrics
+from src.data_processor import DEFAULT_CHUNK_SIZE, find_duplicates, process_large_dataset
+from src.metrics import (
+    REGISTRY,
+    MemorySink,
+    MetricsRegistry,
+    PrometheusFileSink,
+    log_linear_buckets,
+)
+
+
+OPERATIONS = ["duplicates", "statistics"]
+
+
+@pytest.fixture
+def random_data():
+    """100,000 random integers with repeats"""
+    rng = random.Random(5)
+    return [rng.randrange(50_000) for _ in range(100_000)]
+
+
+@pytest.fixture
+def registry_enabled():
+    """Restore REGISTRY.enabled after a test"""
+    enabled = REGISTRY.enabled
+    yield REGISTRY
+    REGISTRY.enabled = enabled
+
+
+def _updates_per_call(data):
+    """Metric updates (inc and observe calls) made by one process_large_dataset call"""
+    calls = []
+    with pytest.MonkeyPatch.context() as patch:
+        for child, method in ((metrics._CounterChild, "inc"), (metrics._HistogramChild, "observe")):
+            def counted(self, *args, _original=getattr(child, method)):
+                calls.append(None)
+                return _original(self, *args)
+
+            patch.setattr(child, method, counted)
+        process_large_dataset(data, OPERATIONS)
+    return len(calls)
+
+
+@pytest.mark.benchmark(group="metrics-overhead")
+def test_process_large_dataset_metrics_enabled(benchmark, random_data, registry_enabled):
+    """
+    Benchmark the instrumented path with metrics on.
+
+    Records the estimated share of the call spent on metric updates
+    as extra_info["metrics_overhead"] (target: under 0.01).
+    """
+    registry_enabled.enabled = True
+    benchmark(process_large_dataset, random_data, OPERATIONS)
+    if benchmark.stats:
+        # Most expensive update: a histogram observation. The probe gets
+        # its own registry so no test metric reaches REGISTRY's exports
+        timings = MetricsRegistry().histogram("overhead_seconds", "Overhead probe").labels()
+        per_update = min(timeit.repeat(
+            lambda: timings.observe(1e-3), number=10_000, repeat=5
+        )) / 10_000
+        updates = _updates_per_call(random_data)
+        benchmark.extra_info["metric_updates"] = updates
+        benchmark.extra_info["metrics_overhead"] = updates * per_update / benchmark.stats.stats.min
+
+
+@pytest.mark.benchmark(group="metrics-overhead")
+def test_process_large_dataset_metrics_disabled(benchmark, random_data, registry_enabled):
+    """Benchmark the instrumented path with metrics off"""
+    registry_enabled.enabled = False
+    benchmark(process_large_dataset, random_data, OPERATIONS)
+
+
+# Correctness tests (not benchmarked)
+class TestMetrics:
+    """Test metric types, exposition format and sinks"""
+
+    def test_updates_per_call_not_per_element(self, random_data, registry_enabled):
+        """Hot paths update metrics a few times per call and chunk, never per element"""
+        registry_enabled.enabled = True
+        for size in (1_000, 10_000, len(random_data)):
+            chunks = math.ceil(size / DEFAULT_CHUNK_SIZE)
+            assert 0 < _updates_per_call(random_data[:size]) <= 16 + 2 * chunks
+
+    def test_counter_and_labels(self):
+        """Labelled children count independently"""
+        registry = MetricsRegistry()
+        calls = registry.counter("calls_total", "Calls", ["algorithm"])
+        calls.labels(algorithm="hash").inc()
+        calls.labels(algorithm="hash").inc(2)
+        calls.labels(algorithm="sorted").inc()
+        assert registry.collect()["calls_total"] == {
+            (("algorithm", "hash"),): 3,
+            (("algorithm", "sorted"),): 1,
+        }
+        assert registry.counter("calls_total", "Calls", ["algorithm"]) is calls
+        with pytest.raises(ValueError):
+            registry.histogram("calls_total", "Calls", ["algorithm"])
+        with pytest.raises(ValueError):
+            calls.labels(other="x")
+
+    def test_log_linear_buckets(self):
+        """Buckets split each doubling evenly and cover the range"""
+        assert log_linear_buckets(1, 4, sub_buckets=2) == [1, 1.5, 2, 3, 4]
+        bounds = log_linear_buckets(1e-6, 120)
+        assert bounds[-1] >= 120
+        widths = [high / low - 1 for low, high in zip(bounds, bounds[1:])]
+        assert max(widths) <= 0.25 + 1e-9
+
+    def test_histogram_buckets_and_quantile(self):
+        """Observations land in the first bucket whose bound covers them"""
+        registry = MetricsRegistry()
+        latency = registry.histogram("latency_seconds", "Latency", buckets=[1, 2, 4])
+        for value in (0.5, 1, 1.5, 3, 10):
+            latency.observe(value)
+        child = latency.labels()
+        assert child.counts == [2, 1, 1, 1]
+        assert child.quantile(0.5) == 2
+        assert child.quantile(1.0) == math.inf
+        value = registry.collect()["latency_seconds"][()]
+        assert value["count"] == 5
+        assert value["sum"] == pytest.approx(16)
+        assert value["buckets"] == [(1, 2), (2, 3), (4, 4), (math.inf, 5)]
+
+    def test_prometheus_text(self):
+        """Exposition follows the Prometheus text format"""
+        registry = MetricsRegistry()
+        registry.counter("calls_total", "Calls", ["algorithm"]).labels(algorithm='a"b').inc()
+        registry.histogram("latency_seconds", "Latency", buckets=[0.5]).observe(0.25)
+        assert registry.to_prometheus() == (
+            "# HELP calls_total Calls\n"
+            "# TYPE calls_total counter\n"
+            'calls_total{algorithm="a\\"b"} 1\n'
+            "# HELP latency_seconds Latency\n"
+            "# TYPE latency_seconds histogram\n"
+            'latency_seconds_bucket{le="0.5"} 1\n'
+            'latency_seconds_bucket{le="+Inf"} 1\n'
+            "latency_seconds_sum 0.25\n"
+            "latency_seconds_count 1\n"
+        )
+
+    def test_disabled_and_reset(self):
+        """Disabled registries drop updates; reset keeps bound children live"""
+        registry = MetricsRegistry(enabled=False)
+        child = registry.counter("calls_total", "Calls").labels()
+        child.inc()
+        assert child.value == 0
+        registry.enabled = True
+        child.inc(5)
+        registry.reset()
+        child.inc()
+        assert registry.collect()["calls_total"] == {(): 1}
+
+    def test_sinks(self, tmp_path):
+        """Exports reach every sink"""
+        registry = MetricsRegistry()
+        memory = MemorySink()
+        path = str(tmp_path / "metrics.prom")
+        registry.add_sink(memory)
+        registry.add_sink(PrometheusFileSink(path))
+        calls = registry.counter("calls_total", "Calls", ["algorithm"])
+        calls.labels(algorithm="hash").inc()
+        registry.export()
+        calls.labels(algorithm="hash").inc()
+        registry.export()
+        assert memory.value("calls_total", algorithm="hash") == 2
+        assert memory.snapshots[0]["calls_total"] == {(("algorithm", "hash"),): 1}
+        with open(path) as exported:
+            assert exported.read() == memory.texts[-1]
+
+    def test_hot_paths_report_algorithm_and_timings(self, registry_enabled):
+        """process_large_dataset records sizes, steps and algorithms"""
+        registry_enabled.enabled = True
+        sink = MemorySink()
+        REGISTRY.reset()
+        find_duplicates([3, 1, 3])
+        process_large_dataset([1, 2, 2, 3], ["duplicates", "statistics", "filter"])
+        process_large_dataset(list(range(10)), ["statistics"], progress=lambda done, total: None, chunk_size=4)
+        sink.write(REGISTRY)
+
+        assert sink.value("find_duplicates_calls_total", algorithm="hash") == 1
+        assert sink.value("find_duplicates_calls_total", algorithm="sorted") == 1
+        assert sink.value("process_large_dataset_input_elements")["count"] == 2
+        # The sorted input shares one sort; the progress run streams three chunks
+        assert sink.value("process_large_dataset_chunks_total") == 3
+        for operation in ("sort", "duplicates", "statistics", "filter", "frequencies"):
+            assert sink.value("process_large_dataset_operation_seconds", operation=operation)["count"] == 1
+        assert "find_duplicates_calls_total{algorithm=\"hash\"} 1" in sink.texts[-1]
@@ -0,0 +1,100 @@
+"""
+Tests for chunked parallel execution, and thread-vs-process scaling
+benchmarks on the same machine.
+"""
+
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from src.data_processor import calculate_statistics, filter_and_transform, find_duplicates
+from src.parallel import gil_enabled, parallel_calculate_statistics, parallel_find_duplicates
+
+
+SIZE = 1_000_000
+WORKER_COUNTS = [1, 2, 4]
+
+
+@pytest.fixture(scope="module")
+def int_array():
+    """1,000,000 random int64 values with repeats"""
+    return np.random.default_rng(3).integers(0, SIZE // 2, SIZE)
+
+
+@pytest.fixture(scope="module", params=["threads", "processes"])
+def pools(request):
+    """One pool per executor kind and worker count, reused across rounds"""
+    factory = ThreadPoolExecutor if request.param == "threads" else ProcessPoolExecutor
+    pools = {workers: factory(max_workers=workers) for workers in WORKER_COUNTS}
+    yield request.param, pools
+    for pool in pools.values():
+        pool.shutdown()
+
+
+def _record(benchmark, kind, workers):
+    benchmark.extra_info.update(
+        executor=kind, workers=workers, size=SIZE, cpu_count=os.cpu_count(), gil_enabled=gil_enabled()
+    )
+
+
+@pytest.mark.benchmark(group="parallel-find_duplicates")
+@pytest.mark.parametrize("workers", WORKER_COUNTS)
+def test_parallel_find_duplicates_scaling(benchmark, int_array, pools, workers):
+    """Benchmark find_duplicates per executor and worker count"""
+    kind, pool = pools[0], pools[1][workers]
+    _record(benchmark, kind, workers)
+    result = benchmark.pedantic(
+        parallel_find_duplicates, args=(int_array, pool, workers), rounds=3, warmup_rounds=1
+    )
+    assert len(result) > 0
+
+
+@pytest.mark.benchmark(group="parallel-calculate_statistics")
+@pytest.mark.parametrize("workers", WORKER_COUNTS)
+def test_parallel_calculate_statistics_scaling(benchmark, int_array, pools, workers):
+    """Benchmark calculate_statistics per executor and worker count"""
+    kind, pool = pools[0], pools[1][workers]
+    _record(benchmark, kind, workers)
+    result = benchmark.pedantic(
+        parallel_calculate_statistics, args=(int_array, pool, workers), rounds=3, warmup_rounds=1
+    )
+    assert result["mean"] == pytest.approx(int_array.mean())
+
+
+# Correctness tests (not benchmarked)
+class TestParallel:
+    """Test that parallel results match the sequential functions"""
+
+    @pytest.mark.parametrize("executor", ["threads", "processes"])
+    def test_matches_sequential(self, executor):
+        """Duplicates, statistics and filter agree with the sequential code"""
+        rng = random.Random(8)
+        data = [rng.randrange(2_000) for _ in range(20_001)]
+        assert find_duplicates(data, executor=executor, workers=2) == sorted(find_duplicates(data))
+        assert calculate_statistics(data, executor=executor, workers=2) == calculate_statistics(data)
+        assert filter_and_transform(data, 1_000, executor=executor, workers=2) == filter_and_transform(data, 1_000)
+
+    def test_python_kernels(self):
+        """Non-numeric and mixed data fall back to Counter partial states"""
+        words = ["a", "b", "a", "c", "b"] * 3 + ["d"]
+        assert sorted(find_duplicates(words, executor="threads")) == ["a", "b", "c"]
+        mixed = [1, 2.5, 2.5, 4, 1, 1]
+        assert calculate_statistics(mixed, executor="threads") == calculate_statistics(mixed)
+        huge = [1 << 62, 1 << 62, 3]
+        assert calculate_statistics(huge, executor="threads") == calculate_statistics(huge)
+
+    def test_floats_and_even_counts(self):
+        """Float medians average the middle pair; ties in mode go to the smallest"""
+        data = [0.5, 2.5, 2.5, 1.5, 1.5, 9.0]
+        result = parallel_calculate_statistics(np.array(data), "threads", workers=2, chunk_size=2)
+        assert result == {"mean": pytest.approx(17.5 / 6), "median": 2.0, "mode": 1.5}
+
+    def test_empty_and_bad_executor(self):
+        """Empty input short-circuits; unknown executors are rejected"""
+        assert find_duplicates([], executor="threads") == []
+        assert calculate_statistics([], executor="threads")["mean"] is None
+        assert filter_and_transform([], 1, executor="threads") == []
+        with pytest.raises(ValueError):
+            find_duplicates([1, 1], executor="fibers")
@@ -3,9 +3,16 @@ Performance tests for data_processor module.
 Uses pytest-benchmark to measure function execution time.
 """
 
+import random
+
+import numpy as np
 import pytest
+from src.benchreport import measure_peak_memory
 from src.data_processor import (
+    _few_distinct,
+    _near_clusters_python,
     find_duplicates,
+    find_near_duplicates,
     calculate_statistics,
     filter_and_transform,
     process_large_dataset,
@@ -53,6 +60,7 @@ def test_find_duplicates_medium(benchmark, medium_dataset):
 def test_find_duplicates_large(benchmark, large_dataset):
     """Benchmark find_duplicates with large dataset"""
     result = benchmark(find_duplicates, large_dataset)
+    benchmark.extra_info["peak_memory"] = measure_peak_memory(find_duplicates, large_dataset)
     assert len(result) == 5000
 
 
@@ -74,6 +82,7 @@ def test_calculate_statistics_medium(benchmark, medium_dataset):
 def test_calculate_statistics_large(benchmark, large_dataset):
     """Benchmark calculate_statistics with large dataset"""
     result = benchmark(calculate_statistics, large_dataset)
+    benchmark.extra_info["peak_memory"] = measure_peak_memory(calculate_statistics, large_dataset)
     assert result["mean"] == pytest.approx(2499.5)
 
 
@@ -93,9 +102,45 @@ def test_filter_and_transform_medium(benchmark, medium_dataset):
 def test_filter_and_transform_large(benchmark, large_dataset):
     """Benchmark filter_and_transform with large dataset"""
     result = benchmark(filter_and_transform, large_dataset, threshold=2500)
+    benchmark.extra_info["peak_memory"] = measure_peak_memory(filter_and_transform, large_dataset, threshold=2500)
     assert len(result) > 0
 
 
+def test_calculate_statistics_sorted_large(benchmark, large_dataset):
+    """Benchmark calculate_statistics on already sorted input (no re-sort)"""
+    data = sorted(large_dataset)
+    result = benchmark(calculate_statistics, data)
+    assert result["median"] == pytest.approx(2499.5)
+
+
+def test_find_duplicates_sorted_large(benchmark, large_dataset):
+    """Benchmark find_duplicates on sorted input (adjacent run scan)"""
+    data = sorted(large_dataset)
+    result = benchmark(find_duplicates, data)
+    assert len(result) == 5000
+
+
+# Benchmark tests for find_near_duplicates
+@pytest.fixture
+def sensor_data():
+    """Noisy float readings (100,000 items) with jittered repeats"""
+    rng = random.Random(0)
+    base = [rng.uniform(0, 1000) for _ in range(50_000)]
+    return base + [value * (1 + rng.uniform(-1e-10, 1e-10)) for value in base]
+
+
+def test_find_near_duplicates_large(benchmark, sensor_data):
+    """Benchmark find_near_duplicates (vectorized path)"""
+    result = benchmark(find_near_duplicates, sensor_data, rel_tol=1e-9)
+    assert len(result) >= 49_000
+
+
+def test_find_near_duplicates_python_large(benchmark, sensor_data):
+    """Benchmark the pure-Python sort-and-sweep on the same data"""
+    result = benchmark(_near_clusters_python, sensor_data, 0.0, 1e-9)
+    assert len(result) >= 49_000
+
+
 # Comprehensive benchmark
 def test_process_large_dataset(benchmark, large_dataset):
     """Benchmark all operations together"""
@@ -128,3 +173,116 @@ class TestCorrectness:
         data = [1, 5, 10, 15, 20]
         result = filter_and_transform(data, threshold=10)
         assert result == ["15", "20"]
+
+    def test_find_duplicates_sorted_input(self):
+        """Sorted input is scanned for adjacent runs instead of hashed"""
+        assert find_duplicates([1, 1, 2, 3, 3, 3, 4]) == [1, 3]
+        assert set(find_duplicates([3, 1, 3, 1])) == {1, 3}
+        assert find_duplicates([]) == []
+        assert find_duplicates(np.array([1, 2, 2, 3, 3])) == [2, 3]
+        assert find_duplicates(np.array([], dtype=np.int64)) == []
+
+    def test_find_duplicates_iterables(self):
+        """One-shot iterables and sets are accepted, as with a plain loop"""
+        assert find_duplicates(iter([1, 2, 2])) == [2]
+        assert sorted(find_duplicates(value % 3 for value in range(7))) == [0, 1, 2]
+        assert find_duplicates({3, 1, 2}) == []
+
+    def test_find_duplicates_unorderable_items(self):
+        """Items that cannot be ordered fall back to hashing"""
+        result = find_duplicates([1, "a", 1, "a", None])
+        assert set(result) == {1, "a"}
+
+    def test_calculate_statistics_presorted_matches_unsorted(self):
+        """Sorted fast path and sorting path agree, ties go to the smallest value"""
+        data = [5, 1, 4, 1, 5, 9, 2, 6]
+        expected = {"mean": 4.125, "median": 4.5, "mode": 1}
+        assert calculate_statistics(data) == expected
+        assert calculate_statistics(sorted(data), presorted=True) == expected
+
+    def test_process_large_dataset_shared_sort(self):
+        """Mostly distinct data shares one sort and gives the same answers as the separate calls"""
+        data = [7, 3, 3, 9, 1, 7, 7]
+        assert not _few_distinct(data)
+        result = process_large_dataset(data, ["duplicates", "statistics", "filter"])
+        assert sorted(result["duplicates"]) == [3, 7]
+        assert result["statistics"] == calculate_statistics(data)
+        assert result["filtered"] == filter_and_transform(data, sum(data) / len(data))
+
+    def test_process_large_dataset_frequency_pass(self):
+        """Unsorted data with few distinct values takes the frequency pass, with the same answers"""
+        data = [7, 3, 3, 9, 1, 7, 7, 3, 1, 9] * 1000
+        assert _few_distinct(data)
+        assert not _few_distinct(list(range(10_000))) and not _few_distinct([[1], [1]])
+        result = process_large_dataset(data, ["duplicates", "statistics", "filter"])
+        assert sorted(result["duplicates"]) == [1, 3, 7, 9]
+        assert result["statistics"] == calculate_statistics(data)
+        assert result["filtered"] == filter_and_transform(data, sum(data) / len(data))
+
+    def test_process_large_dataset_progress_reports(self):
+        """Chunked path reports progress and matches the exact results"""
+        data = [7, 3, 3, 9, 1, 7, 7, 2, 8, 8]
+        reports = []
+        result = process_large_dataset(
+            data,
+            ["duplicates", "statistics", "filter"],
+            progress=lambda done, total: reports.append((done, total)),
+            chunk_size=3,
+        )
+        expected = process_large_dataset(data, ["duplicates", "statistics", "filter"])
+        assert result["partial"] is False
+        assert reports[-1] == (20, 20)
+        assert [done for done, _ in reports] == sorted(done for done, _ in reports)
+        assert sorted(result["duplicates"]) == sorted(expected["duplicates"])
+        assert result["statistics"] == expected["statistics"]
+        assert result["filtered"] == expected["filtered"]
+
+    def test_process_large_dataset_deadline_partial(self):
+        """An expired deadline returns flagged partial results"""
+        data = list(range(1000))
+        result = process_large_dataset(
+            data, ["statistics", "filter"], deadline=0, chunk_size=100
+        )
+        statistics = result["statistics"]
+        assert result["partial"] is True
+        assert result["processed"] == {"elements": 100, "total": 2000}
+        assert statistics["approximate"] is True
+        assert statistics["mean_stderr"] > 0
+        # Sorted input: the strided sample still brackets the true values
+        assert abs(statistics["mean"] - 499.5) <= 2 * statistics["mean_stderr"]
+        assert abs(statistics["median"] - 499.5) <= 1000 * 2 * statistics["median_quantile_stderr"]
+        assert result["filtered"] == []
+
+    def test_find_near_duplicates_correctness(self):
+        """Values within tolerance are clustered, others are not"""
+        data = [1.0, 5.0, 1.0000001, 3.0, 5.0, 0.9999999]
+        assert find_near_duplicates(data, abs_tol=1e-6) == [
+            {"representative": 1.0, "members": [0.9999999, 1.0, 1.0000001]},
+            {"representative": 5.0, "members": [5.0, 5.0]},
+        ]
+        assert find_near_duplicates(data) == [
+            {"representative": 5.0, "members": [5.0, 5.0]}
+        ]
+        with pytest.raises(ValueError):
+            find_near_duplicates(data, abs_tol=-1)
+
+    def test_find_near_duplicates_paths_agree(self):
+        """Pure-Python and vectorized paths produce identical clusters"""
+        rng = random.Random(1)
+        data = [round(rng.uniform(0, 100), 2) for _ in range(20_000)]
+        expected = _near_clusters_python(data, 0.005, 0.0)
+        result = find_near_duplicates(data, abs_tol=0.005, rel_tol=0.0)
+        assert [cluster["members"] for cluster in result] == expected
+
+    def test_find_near_duplicates_keeps_integer_types(self):
+        """Integer members stay ints on both paths"""
+        small = [5, 3, 5, 1]
+        large = small * 5_000
+        for data in (small, large):
+            members = [member for cluster in find_near_duplicates(data) for member in cluster["members"]]
+            assert members and {type(member) for member in members} == {int}
+        assert find_near_duplicates(large)[0]["members"][:3] == [1, 1, 1]
+        mixed = [2, 1.0, 2.0, 1] * 5_000
+        members = find_near_duplicates(mixed)[0]["members"]
+        assert members == _near_clusters_python(mixed, 0.0, 1e-09)[0]
+        assert members[:2] == [1.0, 1] and type(members[1]) is int
@@ -0,0 +1,173 @@
+"""
+Tests and benchmarks for streaming pipelines.
+"""
+
+import io
+import random
+
+import pytest
+from src.data_processor import calculate_statistics, filter_and_transform, process_large_dataset
+from src.distributed import PartialState
+from src.formatting import format_lines, upper_text
+from src.pipeline import Collect, Duplicates, Frequencies, Pipeline, Statistics, TopK, Writer
+
+
+def separate_passes(values, threshold):
+    """Reference: filter, dedup and statistics as one full pass each"""
+    kept = [value for value in values if value > threshold]
+    unique = list(dict.fromkeys(kept))
+    return calculate_statistics(unique)
+
+
+@pytest.fixture
+def readings():
+    """200,000 integer readings with repeats"""
+    rng = random.Random(0)
+    return [rng.randint(0, 100_000) for _ in range(200_000)]
+
+
+def test_fused_pipeline(benchmark, readings):
+    """Benchmark filter > dedup > statistics streamed in one pass"""
+    pipeline = Pipeline(readings).above(50_000).dedup()
+    result = benchmark(lambda: pipeline.run(Statistics()).results[0])
+    assert result == separate_passes(readings, 50_000)
+
+
+def test_separate_passes(benchmark, readings):
+    """Benchmark the same work as separate full passes, for comparison"""
+    benchmark(separate_passes, readings, 50_000)
+
+
+# Correctness tests (not benchmarked)
+class TestPipeline:
+    """Test stages, sinks and sources"""
+
+    def test_stages_compose_in_order(self):
+        """Item stages fuse without changing the result"""
+        pipeline = Pipeline(range(20), chunk_size=6).above(3).filter(lambda x: x % 2).map(lambda x: x * 10)
+        assert pipeline.run(Collect()).results == [[50, 70, 90, 110, 130, 150, 170, 190]]
+        assert pipeline.map(str).run(Collect()).results == [["50", "70", "90", "110", "130", "150", "170", "190"]]
+
+    def test_pipelines_are_immutable_and_rerunnable(self):
+        """Stages return new pipelines and dedup state is per run"""
+        base = Pipeline([1, 1, 2])
+        deduped = base.dedup()
+        assert base.stages == ()
+        assert deduped.run(Collect()).results == [[1, 2]]
+        assert deduped.run(Collect()).results == [[1, 2]]
+
+    def test_dedup_across_chunks(self):
+        """The first occurrence is kept even when repeats are chunks apart"""
+        values = [3, 1, 3, 2, 1, 4, 2, 5]
+        assert Pipeline(values, chunk_size=3).dedup().run(Collect()).results == [[3, 1, 2, 4, 5]]
+
+    def test_numpy_chunks(self):
+        """Threshold filters on arrays are masks; results match lists"""
+        np = pytest.importorskip("numpy")
+        values = np.arange(100)
+        pipeline = Pipeline(values, chunk_size=16).above(89).map(lambda x: x * 2)
+        assert pipeline.run(Collect()).results == [[180, 182, 184, 186, 188, 190, 192, 194, 196, 198]]
+        chunks = list(Pipeline(values, chunk_size=16).above(89).chunks())
+        assert [chunk.tolist() for chunk in chunks] == [[90, 91, 92, 93, 94, 95], [96, 97, 98, 99]]
+
+    def test_sinks_share_one_pass(self):
+        """Several sinks receive the same chunks"""
+        rng = random.Random(1)
+        values = [rng.randint(0, 50) for _ in range(1_000)]
+        stats, duplicates, top = Pipeline(values, chunk_size=64).run(Statistics(), Duplicates(), TopK(3)).results
+        assert stats == calculate_statistics(values)
+        assert sorted(duplicates) == sorted(value for value in set(values) if values.count(value) > 1)
+        assert top == sorted(values, reverse=True)[:3]
+
+    def test_frequencies_of_non_numbers(self):
+        """Duplicates work for any hashable values; the sum is dropped"""
+        frequencies = Pipeline(["a", "b", "a"]).run(Frequencies()).results[0]
+        assert frequencies.duplicates() == ["a"]
+        assert frequencies.total is None
+
+    def test_frequencies_are_partial_states(self):
+        """Frequencies merge and serialize like the shards' partial states"""
+        frequencies = Pipeline([1, 2, 2], chunk_size=2).run(Frequencies()).results[0]
+        merged = PartialState.from_bytes(frequencies.to_bytes()).merge(PartialState.from_values([2, 5]))
+        assert merged.results(["duplicates", "statistics"]) == {
+            "duplicates": [2], "statistics": calculate_statistics([1, 2, 2, 2, 5]),
+        }
+
+    def test_top_k_with_key(self):
+        """TopK honours a sort key"""
+        assert Pipeline([-9, 2, 5, -1], chunk_size=2).run(TopK(2, key=abs)).results == [[-9, 5]]
+
+    def test_writer(self):
+        """Writer streams each chunk to a binary file"""
+        out = io.BytesIO()
+        run = Pipeline(range(10), chunk_size=4).above(6).run(Writer(out))
+        assert run.results == [3]
+        assert out.getvalue() == b"7\n8\n9\n"
+        assert format_lines([7, 8, 9]) == out.getvalue()
+
+    def test_generator_source(self):
+        """Iterables without len are read once, in chunks"""
+        run = Pipeline((x * x for x in range(10)), chunk_size=3).run(Collect())
+        assert run == ([[x * x for x in range(10)]], True, 10)
+
+    def test_file_sources(self, tmp_path):
+        """CSV columns and plain lines are read a chunk at a time"""
+        table = tmp_path / "table.csv"
+        table.write_text("id,value\n1,5\n2,7.5\n3,5\n")
+        assert Pipeline.from_file(table, column="value", chunk_size=2).run(Collect()).results == [[5, 7.5, 5]]
+        lines = tmp_path / "lines.txt"
+        lines.write_text("3\n\n4\n")
+        assert Pipeline.from_file(lines).run(Collect()).results == [[3, 4]]
+        with pytest.raises(ValueError):
+            Pipeline.from_file(table, column="missing").run(Collect())
+
+    def test_strided_chunks(self):
+        """Strided chunks interleave and cover every value once"""
+        chunks = list(Pipeline.strided(list(range(10)), chunk_size=4).chunks())
+        assert chunks == [[0, 3, 6, 9], [1, 4, 7], [2, 5, 8]]
+
+    def test_deadline_and_progress(self):
+        """An expired deadline stops after the current chunk"""
+        reports = []
+        run = Pipeline(range(1000), chunk_size=100).run(Collect(), deadline=0, progress=reports.append)
+        assert run.complete is False
+        assert run.elements == 100
+        assert reports == [100]
+        # Nothing left to read: the run is complete
+        assert Pipeline(range(100), chunk_size=100).run(Collect(), deadline=0).complete is True
+
+    def test_deadline_keeps_generator_values(self):
+        """A deadline stop reads no chunk ahead, so a generator can be resumed"""
+        values = iter(range(250))
+        run = Pipeline(values, chunk_size=100).run(Collect(), deadline=0)
+        assert run.complete is False and run.results[0] == list(range(100))
+        assert list(values) == list(range(100, 250))
+        # The end shows once a chunk comes up short
+        assert Pipeline(iter(range(50)), chunk_size=100).run(Collect(), deadline=0).complete is True
+
+    def test_process_large_dataset_equivalence(self):
+        """process_large_dataset matches the individual operations"""
+        rng = random.Random(2)
+        values = [rng.randint(0, 300) for _ in range(5_000)]
+        result = process_large_dataset(values, ["duplicates", "statistics", "filter"], chunk_size=512)
+        mean = sum(values) / len(values)
+        assert result["statistics"] == calculate_statistics(values)
+        assert result["filtered"] == filter_and_transform(values, mean)
+        assert result["filtered"] == upper_text([value for value in values if value > mean])
+        assert sorted(result["duplicates"]) == sorted(value for value in set(values) if values.count(value) > 1)
+
+    def test_process_large_dataset_arrays(self):
+        """NumPy input gives the list results on both the shared-sort and frequency paths"""
+        np = pytest.importorskip("numpy")
+        rng = random.Random(6)
+        for high in (300, 10 ** 9):
+            values = [rng.randint(0, high) for _ in range(5_000)]
+            array = np.array(values)
+            for operations in (["duplicates"], ["statistics"], ["filter"], ["duplicates", "statistics", "filter"]):
+                expected = process_large_dataset(values, operations)
+                result = process_large_dataset(array, operations)
+                assert sorted(result.pop("duplicates", [])) == sorted(expected.pop("duplicates", []))
+                assert result == expected
+        assert process_large_dataset(np.array([], dtype=np.int64), ["duplicates", "filter"]) == {
+            "duplicates": [], "filtered": [],
+        }
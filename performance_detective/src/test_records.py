@@ -0,0 +1,104 @@
+"""
+Tests and benchmarks for record-level duplicate detection.
+"""
+
+import random
+from pathlib import Path
+
+import pytest
+from src import records
+from src.records import _groups_python, find_duplicate_rows, read_columns
+
+
+SAMPLE_CSV = Path(__file__).resolve().parent.parent / "data" / "sample_data.csv"
+
+
+def naive_groups(columns, keys):
+    """Reference grouping by key tuples"""
+    return sorted(_groups_python(columns, keys))
+
+
+@pytest.fixture
+def large_table():
+    """Table of 200,000 rows with repeated (value, category) keys"""
+    rng = random.Random(0)
+    n = 200_000
+    return {
+        "id": list(range(n)),
+        "value": [rng.randint(1, n // 2) for _ in range(n)],
+        "category": [rng.choice("ABCDE") for _ in range(n)],
+    }
+
+
+def test_find_duplicate_rows_large(benchmark, large_table):
+    """Benchmark vectorized row dedup on a (value, category) key"""
+    result = benchmark(find_duplicate_rows, large_table, keys=["value", "category"])
+    assert result == naive_groups(large_table, ["value", "category"])
+
+
+def test_find_duplicate_rows_python_large(benchmark, large_table):
+    """Benchmark the tuple-dictionary fallback for comparison"""
+    result = benchmark(_groups_python, large_table, ["value", "category"])
+    assert len(result) > 0
+
+
+# Correctness tests (not benchmarked)
+class TestFindDuplicateRows:
+    """Test grouping, key selection and input validation"""
+
+    def test_sample_csv_key_subset(self):
+        """Groups on sample_data.csv match a tuple-based reference"""
+        columns = read_columns(SAMPLE_CSV)
+        result = find_duplicate_rows(columns, keys=["value", "category"])
+        assert result == naive_groups(columns, ["value", "category"])
+        assert all(len(group) > 1 for group in result)
+
+    def test_whole_row_excluding_id(self):
+        """exclude compares every other column"""
+        columns = {
+            "id": [1, 2, 3, 4, 5],
+            "value": [10, 20, 10, 10, 20],
+            "category": ["A", "B", "A", "C", "B"],
+        }
+        assert find_duplicate_rows(columns, exclude=["id"]) == [[0, 2], [1, 4]]
+        assert find_duplicate_rows(columns) == []
+
+    def test_wide_keys_fall_back_to_lexsort(self):
+        """Keys too wide to pack into int64 still group exactly"""
+        n = 5_000
+        columns = {f"c{i}": [(row * (i + 1)) % n for row in range(n)] for i in range(6)}
+        columns["c0"][10] = columns["c0"][0]
+        for i in range(1, 6):
+            columns[f"c{i}"][10] = columns[f"c{i}"][0]
+        assert find_duplicate_rows(columns) == [[0, 10]]
+
+    def test_read_columns_subset(self):
+        """read_columns keeps only the requested columns"""
+        columns = read_columns(SAMPLE_CSV, columns=["id", "category"])
+        assert set(columns) == {"id", "category"}
+        assert len(columns["id"]) == 1000
+
+    def test_invalid_keys(self):
+        """Unknown or mismatched columns are rejected"""
+        with pytest.raises(KeyError):
+            find_duplicate_rows({"a": [1]}, keys=["b"])
+        with pytest.raises(ValueError):
+            find_duplicate_rows({"a": [1], "b": [1, 2]})
+        with pytest.raises(ValueError):
+            find_duplicate_rows({"id": [1]}, exclude=["id"])
+
+    def test_csv_fallback_parses_numbers(self, tmp_path, monkeypatch):
+        """Without pandas, numeric columns still hold numbers and group the same"""
+        path = tmp_path / "table.csv"
+        path.write_text("id,value,category\n1,1.0,A\n2,1,A\n3,2.5,B\n")
+        with_pandas = find_duplicate_rows(read_columns(path), exclude=["id"])
+        monkeypatch.setattr(records, "optional_import", lambda name: None)
+        columns = read_columns(path)
+        assert columns == {"id": [1, 2, 3], "value": [1.0, 1, 2.5], "category": ["A", "A", "B"]}
+        assert find_duplicate_rows(columns, exclude=["id"]) == with_pandas == [[0, 1]]
+
+    def test_columnar_directory_needs_numpy(self, tmp_path, monkeypatch):
+        """A columnar directory without NumPy is a clear ImportError"""
+        monkeypatch.setattr(records, "optional_import", lambda name: None)
+        with pytest.raises(ImportError, match="NumPy"):
+            read_columns(tmp_path)
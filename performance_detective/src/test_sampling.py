@@ -0,0 +1,114 @@
+"""
+Tests and benchmarks for sampling-based approximate statistics.
+The benchmarks compare the exact and approximate paths across
+distributions and record the approximation error in extra_info.
+"""
+
+import random
+
+import pytest
+from src.data_processor import calculate_statistics
+from src.sampling import approximate_statistics, reservoir_sample, sample_size_for
+
+
+DISTRIBUTION_SIZE = 100_000
+
+
+def make_distribution(name, size=DISTRIBUTION_SIZE, seed=42):
+    """Generate test data from a named distribution"""
+    rng = random.Random(seed)
+    if name == "uniform":
+        return [rng.randint(0, 1_000_000) for _ in range(size)]
+    if name == "normal":
+        return [round(rng.gauss(500, 100), 2) for _ in range(size)]
+    if name == "skewed":
+        # Heavy-tailed Pareto: a few huge values, most near 1
+        return [int(rng.paretovariate(1.1)) for _ in range(size)]
+    raise ValueError(name)
+
+
+@pytest.fixture(params=["uniform", "normal", "skewed"])
+def distribution(request):
+    """Dataset drawn from each of the benchmark distributions"""
+    return request.param, make_distribution(request.param)
+
+
+# Benchmarks: exact vs approximate
+def test_statistics_exact(benchmark, distribution):
+    """Benchmark the exact path"""
+    _, data = distribution
+    result = benchmark(calculate_statistics, data)
+    assert result["mean"] is not None
+
+
+def test_statistics_approximate(benchmark, distribution):
+    """Benchmark the sampling path and record its error against exact"""
+    name, data = distribution
+    result = benchmark(calculate_statistics, data, approximate=True, seed=1)
+    exact = calculate_statistics(data)
+    spread = max(data) - min(data)
+    benchmark.extra_info["distribution"] = name
+    benchmark.extra_info["mean_relative_error"] = abs(result["mean"] - exact["mean"]) / abs(exact["mean"])
+    benchmark.extra_info["median_error_over_range"] = abs(result["median"] - exact["median"]) / spread
+    benchmark.extra_info["sample_size"] = result["sample_size"]
+
+
+def test_statistics_approximate_stream(benchmark):
+    """Benchmark reservoir sampling over a one-shot iterable"""
+    data = make_distribution("uniform")
+    result = benchmark(lambda: approximate_statistics(iter(data), seed=1))
+    assert result["population_size"] == len(data)
+
+
+# Correctness tests (not benchmarked)
+class TestApproximateStatistics:
+    """Test the sampling estimators and their intervals"""
+
+    def test_intervals_cover_truth(self):
+        """Intervals contain the exact values on each distribution"""
+        for name in ["uniform", "normal", "skewed"]:
+            data = make_distribution(name, size=50_000)
+            exact = calculate_statistics(data)
+            result = approximate_statistics(data, sample_size=5_000, seed=7)
+            low, high = result["intervals"]["mean"]
+            assert low <= exact["mean"] <= high, name
+            low, high = result["intervals"]["median"]
+            assert low <= exact["median"] <= high, name
+
+    def test_duplicate_rate_bounds(self):
+        """Duplicate rate interval brackets the true rate"""
+        data = [i % 1000 for i in range(20_000)]
+        result = approximate_statistics(data, sample_size=2_000, seed=3)
+        true_rate = 1 - 1000 / 20_000
+        low, high = result["intervals"]["duplicate_rate"]
+        assert low <= true_rate <= high
+        assert result["duplicate_rate"] == pytest.approx(true_rate, abs=0.05)
+
+    def test_full_sample_is_exact(self):
+        """Sampling everything reproduces the exact statistics"""
+        data = [3, 1, 4, 1, 5, 9, 2, 6]
+        result = approximate_statistics(data, sample_size=100)
+        exact = calculate_statistics(data)
+        assert result["mean"] == exact["mean"]
+        assert result["median"] == exact["median"]
+        assert result["mode"] == exact["mode"]
+        assert result["duplicate_rate"] == pytest.approx(1 / 8)
+        assert result["intervals"]["mean"] == (exact["mean"], exact["mean"])
+
+    def test_target_error_sets_sample_size(self):
+        """target_error picks a sample size from the quantile bound"""
+        assert sample_size_for(0.01) == 9604
+        result = calculate_statistics(
+            range(100_000), approximate=True, target_error=0.05, seed=0
+        )
+        assert result["sample_size"] == sample_size_for(0.05)
+        with pytest.raises(ValueError):
+            sample_size_for(0.7)
+
+    def test_reservoir_sample_uniform(self):
+        """Reservoir sampling sees every element and keeps k of them"""
+        sample, seen = reservoir_sample(iter(range(10_000)), 100, random.Random(5))
+        assert seen == 10_000
+        assert len(set(sample)) == 100
+        assert 3_000 < sum(sample) / 100 < 7_000
+        assert reservoir_sample(range(3), 10) == ([0, 1, 2], 3)
@@ -0,0 +1,109 @@
+"""
+Tests and benchmarks for the persistent seen-set index.
+"""
+
+import random
+from types import SimpleNamespace
+
+import pytest
+from src import seen_index
+from src.seen_index import SeenIndex
+
+
+def test_check_and_insert_throughput(benchmark, tmp_path):
+    """Benchmark checking 100,000 new IDs against a 1,000,000-ID history"""
+    with SeenIndex(tmp_path / "index", memtable_limit=250_000) as index:
+        index.check_and_insert(range(1_000_000))
+        index.flush()
+        batches = iter(range(2_000_000, 10**9, 100_000))
+
+        def check_batch():
+            start = next(batches)
+            return index.check_and_insert(range(start, start + 100_000))
+
+        assert benchmark(check_batch) == []
+
+
+def test_check_and_insert_string_throughput(benchmark, tmp_path):
+    """Benchmark checking 100,000 new string IDs against a 1,000,000-ID history"""
+    with SeenIndex(tmp_path / "index", memtable_limit=250_000) as index:
+        index.check_and_insert(f"user-{i}" for i in range(1_000_000))
+        index.flush()
+        batches = iter(range(2_000_000, 10**9, 100_000))
+
+        def check_batch():
+            start = next(batches)
+            return index.check_and_insert(f"user-{i}" for i in range(start, start + 100_000))
+
+        assert benchmark(check_batch) == []
+
+
+# Correctness tests (not benchmarked)
+class TestSeenIndex:
+    """Test history lookups, persistence, compaction and expiry"""
+
+    def test_reports_history_and_batch_duplicates(self, tmp_path):
+        """Items from earlier batches and repeats within a batch are reported"""
+        with SeenIndex(tmp_path, memtable_limit=3) as index:
+            assert index.check_and_insert(["a", "b"]) == []
+            assert index.check_and_insert(["c", "a", "d", "d"]) == ["a", "d"]
+            assert index.check_and_insert([1, "b", "e"]) == ["b"]
+            assert len(index) == 6
+
+    def test_persists_across_reopen(self, tmp_path):
+        """A reopened index still knows every flushed item"""
+        with SeenIndex(tmp_path, memtable_limit=100) as index:
+            index.check_and_insert(range(1_000))
+        with SeenIndex(tmp_path, memtable_limit=100) as index:
+            assert index.check_and_insert([5, 999, 1_000]) == [5, 999]
+
+    def test_compaction_bounds_run_count(self, tmp_path):
+        """Same-size runs are merged once fanout of them exist"""
+        rng = random.Random(0)
+        ids = rng.sample(range(10**9), 5_000)
+        with SeenIndex(tmp_path, memtable_limit=100, fanout=4) as index:
+            for start in range(0, len(ids), 100):
+                index.check_and_insert(ids[start:start + 100])
+                index.flush()
+            assert len(index.runs) < 10
+            assert sorted(index.check_and_insert(ids[::7])) == sorted(ids[::7])
+            assert index.check_and_insert([-1, -2]) == []
+
+    def test_expire_drops_old_runs(self, tmp_path):
+        """Runs older than the cutoff are forgotten"""
+        with SeenIndex(tmp_path, memtable_limit=10) as index:
+            index.check_and_insert(["old"])
+            index.flush()
+            index.expire(before=float("inf"))
+            assert index.runs == []
+            assert index.check_and_insert(["old"]) == []
+
+    def test_retention_holds_through_compaction(self, tmp_path, monkeypatch):
+        """Merged runs never keep items much past the retention period"""
+        day = 86_400.0
+        clock = SimpleNamespace(now=0.0)
+        monkeypatch.setattr(seen_index, "time", SimpleNamespace(time=lambda: clock.now))
+        retention = 90 * day
+        limit = retention * (1 + 1 / seen_index.RETENTION_BUCKETS)
+        with SeenIndex(tmp_path, memtable_limit=10, fanout=2, retention=retention) as index:
+            for today in range(200):
+                clock.now = today * day
+                index.check_and_insert(range(today * 1_000, today * 1_000 + 10))
+                index.flush()
+                assert all(clock.now - run.meta["oldest"] <= limit for run in index.runs)
+            assert index.check_and_insert(range(64_000, 64_010)) == []
+            assert index.check_and_insert(range(150_000, 150_010)) == list(range(150_000, 150_010))
+
+    def test_pure_python_path(self, tmp_path, monkeypatch):
+        """Without NumPy, lookups and Bloom filters give the same answers"""
+        monkeypatch.setattr(seen_index, "optional_import", lambda name: None)
+        with SeenIndex(tmp_path, memtable_limit=50) as index:
+            index.check_and_insert(range(500))
+            index.flush()
+            assert index.check_and_insert([3, 499, 500, 500]) == [3, 499, 500]
+
+    def test_rejects_unknown_version(self, tmp_path):
+        """Manifests from another format version are refused"""
+        (tmp_path / "manifest.json").write_text('{"version": 99, "next_run": 1, "runs": []}')
+        with pytest.raises(ValueError):
+            SeenIndex(tmp_path)
@@ -0,0 +1,110 @@
+"""
+Tests and benchmarks for rolling-window statistics.
+"""
+
+import random
+
+import pytest
+from src.data_processor import calculate_statistics
+from src.windowed import RollingStatistics, roll
+
+
+def naive_roll(values, window):
+    """Reference: calculate_statistics on every full window"""
+    return [
+        calculate_statistics(values[end - window:end])
+        for end in range(window, len(values) + 1)
+    ]
+
+
+@pytest.fixture
+def stream():
+    """Stream of 20,000 integer readings with repeats"""
+    rng = random.Random(0)
+    return [rng.randint(0, 500) for _ in range(20_000)]
+
+
+def test_roll_large(benchmark, stream):
+    """Benchmark incremental rolling statistics (window 1,000)"""
+    result = benchmark(roll, stream, 1000)
+    assert len(result["median"]) == len(stream) - 999
+
+
+def test_roll_naive_large(benchmark, stream):
+    """Benchmark recomputing calculate_statistics per window, for comparison"""
+    result = benchmark.pedantic(naive_roll, args=(stream[:3000], 1000), rounds=3)
+    assert len(result) == 2001
+
+
+# Correctness tests (not benchmarked)
+class TestRollingStatistics:
+    """Test the incremental state against full recomputation"""
+
+    def test_matches_recomputation(self):
+        """Mean, median and mode match calculate_statistics, ties included"""
+        rng = random.Random(3)
+        for high in (20, 2_000):
+            values = [rng.randint(0, high) for _ in range(2_000)]
+            for window in (1, 2, 7, 50):
+                result = roll(values, window)
+                for i, expected in enumerate(naive_roll(values, window)):
+                    assert result["mean"][i] == pytest.approx(expected["mean"])
+                    assert result["median"][i] == expected["median"]
+                    assert result["mode"][i] == expected["mode"]
+
+    def test_mode_ties_go_to_smallest(self):
+        """A tie goes to the smallest value, not the first to reach the count"""
+        assert roll([9, 9, 3, 3, 5], 4)["mode"] == [3, 3]
+
+    def test_float_values(self):
+        """Medians of floats, including repeated values leaving the window"""
+        values = [0.5, 2.5, 0.5, 1.5, 0.5, 3.5, 2.5]
+        result = roll(values, 3)
+        assert result["median"] == [0.5, 1.5, 0.5, 1.5, 2.5]
+        assert [result["mode"][i] for i in (0, 2)] == [0.5, 0.5]
+
+    def test_heaps_stay_bounded(self):
+        """Deleted values do not pile up in the median or mode heaps on long streams"""
+        rng = random.Random(4)
+        streams = {
+            "increasing": list(range(50_000)),
+            "random": [rng.randint(0, 10_000) for _ in range(50_000)],
+        }
+        for values in streams.values():
+            rolling = RollingStatistics(size=100)
+            largest = entries = 0
+            for value in values:
+                rolling.push(value)
+                largest = max(largest, len(rolling._low) + len(rolling._high))
+                entries = max(entries, sum(map(len, rolling._by_count.values())))
+            assert largest <= 2 * 100 + 2
+            assert entries <= 2 * 100 + 2
+            assert len(rolling._delayed) <= 200
+            expected = calculate_statistics(values[-100:])
+            assert rolling.median() == expected["median"]
+            assert rolling.mode() == expected["mode"]
+
+    def test_time_window(self):
+        """Values older than the duration are evicted"""
+        values = [1, 2, 3, 10, 20]
+        timestamps = [0.0, 1.0, 2.0, 10.0, 10.5]
+        result = roll(values, 5.0, timestamps=timestamps)
+        assert result["mean"] == [1.0, 1.5, 2.0, 10.0, 15.0]
+        assert result["median"] == [1, 1.5, 2, 10, 15.0]
+
+    def test_push_and_validation(self):
+        """push keeps the window bounded and bad arguments are rejected"""
+        rolling = RollingStatistics(size=3)
+        assert rolling.statistics() == {"mean": None, "median": None, "mode": None}
+        for value in [9, 4, 1, 4]:
+            rolling.push(value)
+        assert len(rolling) == 3
+        assert rolling.statistics() == {"mean": 3.0, "median": 4, "mode": 4}
+        with pytest.raises(ValueError):
+            RollingStatistics()
+        with pytest.raises(ValueError):
+            RollingStatistics(duration=1).push(1)
+        timed = RollingStatistics(duration=1)
+        timed.push(1, 5.0)
+        with pytest.raises(ValueError):
+            timed.push(2, 4.0)
@@ -0,0 +1,278 @@
+"""
+Rolling-window statistics.
+
+Recomputing calculate_statistics for every window re-sorts and
+recounts the whole window: O(w log w) per step. RollingStatistics
+keeps incremental state instead, so each new element costs O(log w):
+- Mean: running sum
+- Median: two heaps (lower half max-heap, upper half min-heap) with
+  lazy deletion of values that left the window. Deleted values only
+  leave a heap when they reach its top, so once they outnumber the
+  live ones both heaps are rebuilt from the live values, which keeps
+  the heaps O(w) and costs O(log w) per element amortized
+- Mode: frequency map plus, per count, the number of values with that
+  count and a min-heap of them with lazy deletion, tracking the highest
+  count. Ties go to the smallest value, as in calculate_statistics
+"""
+
+import heapq
+from collections import deque
+from itertools import chain
+
+
+class RollingStatistics:
+    """
+    Mean, median and mode over a sliding window.
+
+    The window is either the last `size` values or the values pushed
+    during the last `duration` seconds (timestamps must not decrease).
+
+    When several values share the highest count, the smallest one is
+    reported as the mode, as in calculate_statistics.
+    """
+
+    def __init__(self, size=None, duration=None):
+        if (size is None) == (duration is None):
+            raise ValueError("give exactly one of size or duration")
+        if size is not None and size < 1:
+            raise ValueError("size must be at least 1")
+        if duration is not None and duration <= 0:
+            raise ValueError("duration must be positive")
+        self.size = size
+        self.duration = duration
+
+        self._window = deque()  # (timestamp, value)
+        self._sum = 0
+
+        # Median: _low holds negated values of the lower half
+        self._low = []
+        self._high = []
+        self._low_size = 0
+        self._high_size = 0
+        self._delayed = {}
+
+        # Mode: value -> count, count -> number of values with it, and
+        # count -> min-heap of values that reached it (entries for
+        # values that have since moved on are dropped lazily)
+        self._counts = {}
+        self._count_sizes = {}
+        self._by_count = {}
+        self._heap_entries = 0
+        self._top = 0
+
+    def __len__(self):
+        return len(self._window)
+
+    def push(self, value, timestamp=None):
+        """
+        Add a value and evict whatever falls out of the window.
+
+        Args:
+            value: Numeric value
+            timestamp: Time of the value in seconds (time windows only)
+        """
+        if self.duration is not None:
+            if timestamp is None:
+                raise ValueError("time windows need a timestamp")
+            if self._window and timestamp < self._window[-1][0]:
+                raise ValueError("timestamps must not decrease")
+
+        self._window.append((timestamp, value))
+        self._sum += value
+        self._add_median(value)
+        self._add_mode(value)
+
+        if self.size is not None:
+            if len(self._window) > self.size:
+                self._evict()
+        else:
+            cutoff = timestamp - self.duration
+            while self._window[0][0] <= cutoff:
+                self._evict()
+
+    def _evict(self):
+        _, value = self._window.popleft()
+        self._sum -= value
+        self._remove_median(value)
+        self._remove_mode(value)
+
+    # Median: dual heaps with lazy deletion
+    def _add_median(self, value):
+        if not self._low or value <= -self._low[0]:
+            heapq.heappush(self._low, -value)
+            self._low_size += 1
+        else:
+            heapq.heappush(self._high, value)
+            self._high_size += 1
+        self._rebalance()
+
+    def _remove_median(self, value):
+        # Equal values are interchangeable, so a value no larger than
+        # the lower half's top can be counted as leaving the lower half
+        self._delayed[value] = self._delayed.get(value, 0) + 1
+        if value <= -self._low[0]:
+            self._low_size -= 1
+            if value == -self._low[0]:
+                self._prune(self._low, -1)
+        else:
+            self._high_size -= 1
+            if self._high and value == self._high[0]:
+                self._prune(self._high, 1)
+        self._rebalance()
+        live = self._low_size + self._high_size
+        if len(self._low) + len(self._high) > 2 * live:
+            self._compact(live)
+
+    def _compact(self, live):
+        """Rebuild both heaps from the live values, dropping delayed ones."""
+        values = []
+        pending = self._delayed
+        for value in chain((-value for value in self._low), self._high):
+            count = pending.get(value)
+            if count:
+                pending[value] = count - 1
+            else:
+                values.append(value)
+        self._delayed = {}
+        values.sort()
+        # Ascending values form a min-heap, and so do descending negated ones
+        self._low_size = (live + 1) // 2
+        self._high_size = live - self._low_size
+        self._low = [-value for value in reversed(values[:self._low_size])]
+        self._high = values[self._low_size:]
+
+    def _prune(self, heap, sign):
+        """Pop values awaiting deletion off the top of a heap."""
+        while heap:
+            value = sign * heap[0]
+            pending = self._delayed.get(value)
+            if not pending:
+                return
+            if pending == 1:
+                del self._delayed[value]
+            else:
+                self._delayed[value] = pending - 1
+            heapq.heappop(heap)
+
+    def _rebalance(self):
+        """Keep the lower half equal to or one larger than the upper half."""
+        if self._low_size > self._high_size + 1:
+            heapq.heappush(self._high, -heapq.heappop(self._low))
+            self._low_size -= 1
+            self._high_size += 1
+            self._prune(self._low, -1)
+        elif self._low_size < self._high_size:
+            heapq.heappush(self._low, -heapq.heappop(self._high))
+            self._low_size += 1
+            self._high_size -= 1
+            self._prune(self._high, 1)
+
+    # Mode: per-count min-heaps with lazy deletion and max tracking
+    def _add_mode(self, value):
+        count = self._counts.get(value, 0)
+        self._move(value, count, count + 1)
+        if count + 1 > self._top:
+            self._top = count + 1
+
+    def _remove_mode(self, value):
+        count = self._counts[value]
+        self._move(value, count, count - 1)
+        # Counts only move by one, so the top drops by at most one
+        if count == self._top and count not in self._count_sizes:
+            self._top -= 1
+
+    def _move(self, value, old, new):
+        """Move a value from count old to count new (0 means absent)."""
+        if old:
+            size = self._count_sizes[old] - 1
+            if size:
+                self._count_sizes[old] = size
+            else:
+                # No value has this count any more: all entries are stale
+                del self._count_sizes[old]
+                self._heap_entries -= len(self._by_count.pop(old))
+        if new:
+            self._counts[value] = new
+            self._count_sizes[new] = self._count_sizes.get(new, 0) + 1
+            heapq.heappush(self._by_count.setdefault(new, []), value)
+            self._heap_entries += 1
+            if self._heap_entries > 2 * len(self._counts):
+                self._compact_mode()
+        else:
+            del self._counts[value]
+
+    def _compact_mode(self):
+        """Rebuild the per-count heaps from the current counts."""
+        by_count = {}
+        for value, count in self._counts.items():
+            by_count.setdefault(count, []).append(value)
+        for heap in by_count.values():
+            heapq.heapify(heap)
+        self._by_count = by_count
+        self._heap_entries = len(self._counts)
+
+    # Results
+    def mean(self):
+        """Mean of the current window, or None when it is empty."""
+        return self._sum / len(self._window) if self._window else None
+
+    def median(self):
+        """Median of the current window, or None when it is empty."""
+        if not self._window:
+            return None
+        if self._low_size > self._high_size:
+            return -self._low[0]
+        return (-self._low[0] + self._high[0]) / 2
+
+    def mode(self):
+        """Mode of the current window, or None when it is empty."""
+        if not self._window:
+            return None
+        heap = self._by_count[self._top]
+        while self._counts.get(heap[0]) != self._top:
+            heapq.heappop(heap)
+            self._heap_entries -= 1
+        return heap[0]
+
+    def statistics(self):
+        """Dictionary with 'mean', 'median', and 'mode' keys."""
+        return {"mean": self.mean(), "median": self.median(), "mode": self.mode()}
+
+
+def roll(values, window, timestamps=None):
+    """
+    Rolling mean, median and mode over a sequence.
+
+    With a count window, one result is produced per full window
+    (len(values) - window + 1 of them). With timestamps, window is a
+    duration in seconds and one result is produced per value, for the
+    window ending at that value.
+
+    Args:
+        values: Sequence of numeric values
+        window: Window length in values, or in seconds with timestamps
+        timestamps: Optional non-decreasing timestamps, one per value
+
+    Returns:
+        Dictionary with 'mean', 'median', and 'mode' lists
+    """
+    means, medians, modes = [], [], []
+    if timestamps is None:
+        rolling = RollingStatistics(size=window)
+        pairs = zip(values, [None] * len(values))
+        first = window - 1
+    else:
+        if len(timestamps) != len(values):
+            raise ValueError("values and timestamps differ in length")
+        rolling = RollingStatistics(duration=window)
+        pairs = zip(values, timestamps)
+        first = 0
+
+    for index, (value, timestamp) in enumerate(pairs):
+        rolling.push(value, timestamp)
+        if index >= first:
+            means.append(rolling.mean())
+            medians.append(rolling.median())
+            modes.append(rolling.mode())
+
+    return {"mean": means, "median": medians, "mode": modes}